@@ -1,14 +1,16 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, Response, stream_with_context
 from flask_cors import CORS
 from flask_login import LoginManager, login_required, current_user, logout_user, login_user
 from werkzeug.security import check_password_hash
 import json
+import threading
+import time
 from datetime import datetime, timedelta
 import sys
 import os
 
 # Import database and models
-from models import db, User
+from models import db, User, Notification
 from config import Config
 
 # Add services directory to path
@@ -41,6 +43,21 @@ except ImportError as e:
         
         def get_financial_advice(self, farmer_query, financial_data=None):
             return "Financial advice would be here"
+        
+        def stream_financial_advice(self, farmer_query, financial_data=None):
+            yield "Financial advice would be here"
+        
+        def stream_pest_disease_advice(self, crop_name, symptoms, weather_conditions):
+            yield "Pest and disease advice would be here"
+        
+        def stream_harvesting_advice(self, crop_name, weather_forecast, market_prices):
+            yield "Harvesting advice would be here"
+        
+        def record_stream_ttfb(self, seconds):
+            pass
+        
+        def get_stats(self):
+            return {}
     
     class MockMLService:
         def predict_crop(self, soil_data):
@@ -52,6 +69,12 @@ except ImportError as e:
                 'confidence': 0.8
             }
         
+        def predict_crop_batch(self, soil_profiles):
+            return [self.predict_crop(soil_data) for soil_data in soil_profiles]
+        
+        def get_stats(self):
+            return {}
+        
         def predict_prices(self, crop_name, days_ahead=30):
             return {
                 'predictions': [],
@@ -74,13 +97,25 @@ except ImportError as e:
                 'current_phase': 'planning'
             }
         
-        def get_farming_dashboard(self, plan_id):
+        def get_plan_version(self, plan_id):
+            return None
+        
+        def get_farming_dashboard(self, plan_id, fields=None, touch=True):
             return {
                 'current_phase': 'planning',
                 'current_weather': {'current': {'temp_c': 28, 'condition': {'text': 'Sunny'}}},
                 'active_alerts': [],
                 'active_reminders': []
             }
+        
+        def init_app(self, app):
+            pass
+        
+        def add_listener(self, callback):
+            pass
+        
+        def get_stats(self):
+            return {}
     
     farming_journey_service = MockFarmingJourneyService()
     
@@ -92,12 +127,21 @@ except ImportError as e:
     
     auth_service = MockAuthService()
 
+from event_bus import event_bus
+
 app = Flask(__name__)
 app.config.from_object(Config)
 
 # Initialize extensions
 db.init_app(app)
 CORS(app)
+farming_journey_service.init_app(app)
+
+# Push plan changes and new notifications to open event streams
+farming_journey_service.add_listener(
+    lambda plan_id, event_type, data: event_bus.publish(f"plan:{plan_id}", event_type, data)
+)
+event_bus.watch_notifications(Notification)
 
 # Initialize Flask-Login
 login_manager = LoginManager()
@@ -112,10 +156,16 @@ def load_user(user_id):
 # Create database tables
 with app.app_context():
     try:
-        db.create_all()
+        db.create_all(bind_key=None)
         print("Database tables created successfully!")
     except Exception as e:
         print(f"Database error: {e}")
+    
+    # Plan documents may live in their own database
+    try:
+        db.create_all(bind_key='plans')
+    except Exception as e:
+        print(f"Plan store database error: {e}")
 
 @app.route('/')
 def home():
@@ -199,6 +249,33 @@ def api_crop_recommendation():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/crop-recommendation/batch', methods=['POST'])
+def api_crop_recommendation_batch():
+    try:
+        data = request.json
+        profiles = data.get('profiles', []) if isinstance(data, dict) else data
+        if not isinstance(profiles, list) or not all(isinstance(p, dict) for p in profiles):
+            return jsonify({'success': False, 'error': 'profiles must be a list of soil data objects'}), 400
+        if len(profiles) > Config.CROP_BATCH_MAX:
+            return jsonify({
+                'success': False,
+                'error': f'At most {Config.CROP_BATCH_MAX} profiles per request'
+            }), 400
+        
+        def generate():
+            # One line per profile, in request order, scored chunk by chunk
+            for start in range(0, len(profiles), Config.CROP_BATCH_CHUNK):
+                chunk = profiles[start:start + Config.CROP_BATCH_CHUNK]
+                for offset, result in enumerate(ml_service.predict_crop_batch(chunk)):
+                    line = {'index': start + offset, **result}
+                    if 'id' in chunk[offset]:
+                        line['id'] = chunk[offset]['id']
+                    yield json.dumps(line) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/api/price-prediction', methods=['POST'])
 def api_price_prediction():
     try:
@@ -281,6 +358,81 @@ def api_harvesting_advice():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+def _sse_event(event, data, event_id=None):
+    """Format one Server-Sent Events frame; the browser echoes event_id back as Last-Event-ID"""
+    frame = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return f"id: {event_id}\n{frame}" if event_id is not None else frame
+
+def _stream_advice(chunks, started_at, meta=None):
+    """Relay advice chunks to the browser as Server-Sent Events"""
+    def generate():
+        if meta is not None:
+            yield _sse_event('meta', meta)
+        
+        first_chunk = True
+        try:
+            for text in chunks:
+                if first_chunk:
+                    api_service.record_stream_ttfb(time.perf_counter() - started_at)
+                    first_chunk = False
+                yield _sse_event('chunk', {'text': text})
+            yield _sse_event('done', {'success': True})
+        except Exception as e:
+            yield _sse_event('error', {'success': False, 'error': str(e)})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/financial-advice/stream', methods=['POST'])
+def api_financial_advice_stream():
+    started_at = time.perf_counter()
+    try:
+        data = request.json
+        query = data.get('query', '')
+        financial_data = data.get('financial_data', {})
+        
+        chunks = api_service.stream_financial_advice(query, financial_data)
+        return _stream_advice(chunks, started_at)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/pest-disease-advice/stream', methods=['POST'])
+def api_pest_disease_advice_stream():
+    started_at = time.perf_counter()
+    try:
+        data = request.json
+        crop_name = data.get('crop', '')
+        symptoms = data.get('symptoms', '')
+        weather_conditions = data.get('weather_conditions', '')
+        
+        chunks = api_service.stream_pest_disease_advice(crop_name, symptoms, weather_conditions)
+        return _stream_advice(chunks, started_at)
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/harvesting-advice/stream', methods=['POST'])
+def api_harvesting_advice_stream():
+    started_at = time.perf_counter()
+    try:
+        data = request.json
+        crop_name = data.get('crop', '')
+        location = data.get('location', 'Delhi')
+        
+        weather_forecast = api_service.get_weather_data(location)
+        market_prices = api_service.get_market_prices(crop_name)
+        price_prediction = ml_service.predict_prices(crop_name, 30)
+        
+        chunks = api_service.stream_harvesting_advice(crop_name, weather_forecast, market_prices)
+        return _stream_advice(chunks, started_at, meta={
+            'price_prediction': price_prediction,
+            'weather_forecast': weather_forecast
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/api/weather', methods=['GET'])
 def api_weather():
     try:
@@ -314,6 +466,8 @@ def api_market_prices():
 def api_start_farming_journey():
     try:
         farmer_data = request.json
+        if current_user.is_authenticated:
+            farmer_data['user_id'] = current_user.id
         
         # Create farming plan
         farming_plan = farming_journey_service.create_farming_plan(farmer_data)
@@ -337,7 +491,9 @@ def api_start_farming_journey():
 @app.route('/api/farming-dashboard/<plan_id>')
 def api_farming_dashboard(plan_id):
     try:
-        dashboard_data = farming_journey_service.get_farming_dashboard(plan_id)
+        # Optional projection, e.g. ?fields=current_weather,active_alerts
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+        dashboard_data = farming_journey_service.get_farming_dashboard(plan_id, fields=fields or None)
         
         if dashboard_data:
             return jsonify({
@@ -359,13 +515,45 @@ def api_update_progress(plan_id):
         progress_update = request.json
         
         # Update farming progress
-        updated_plan = farming_journey_service.update_farming_progress(plan_id, progress_update)
+        progress = farming_journey_service.update_farming_progress(plan_id, progress_update)
         
-        if updated_plan:
+        if progress:
             return jsonify({
                 'success': True,
                 'message': 'Progress updated successfully!',
-                'plan': updated_plan
+                'progress': progress
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Failed to update progress'
+            })
+            
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/update-progress/<plan_id>/bulk', methods=['POST'])
+def api_update_progress_bulk(plan_id):
+    try:
+        data = request.json
+        events = data.get('events', []) if isinstance(data, dict) else data
+        if not isinstance(events, list) or not events:
+            return jsonify({'success': False, 'error': 'events must be a non-empty list'}), 400
+        if len(events) > Config.PROGRESS_BULK_MAX:
+            return jsonify({
+                'success': False,
+                'error': f'At most {Config.PROGRESS_BULK_MAX} events per request'
+            }), 400
+        
+        progress = farming_journey_service.apply_progress_events(plan_id, events)
+        
+        if progress:
+            return jsonify({
+                'success': True,
+                'message': f'{len(events)} progress updates applied',
+                'progress': progress
             })
         else:
             return jsonify({
@@ -373,13 +561,32 @@ def api_update_progress(plan_id):
                 'error': 'Failed to update progress'
             })
             
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/progress-history/<plan_id>')
+def api_progress_history(plan_id):
+    try:
+        after_seq = request.args.get('after', 0, type=int)
+        limit = min(request.args.get('limit', 100, type=int), 500)
+        events = farming_journey_service.get_progress_history(plan_id, after_seq, limit)
+        return jsonify({
+            'success': True,
+            'events': events,
+            'next_after': events[-1]['seq'] if events else after_seq
+        })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/get-reminders/<plan_id>')
 def api_get_reminders(plan_id):
     try:
-        dashboard_data = farming_journey_service.get_farming_dashboard(plan_id)
+        # Polling reminders alone mustn't keep the plan active for the dashboard scheduler
+        dashboard_data = farming_journey_service.get_farming_dashboard(
+            plan_id, fields=['active_reminders', 'active_alerts'], touch=False
+        )
         
         if dashboard_data:
             reminders = dashboard_data.get('active_reminders', [])
@@ -399,6 +606,123 @@ def api_get_reminders(plan_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+def _plan_event_state(plan_id):
+    """The parts of a plan that the event stream keeps the browser in sync with
+
+    Reads with touch=False: an open tab mustn't keep the plan active for the scheduler.
+    """
+    dashboard_data = farming_journey_service.get_farming_dashboard(
+        plan_id, fields=['active_reminders', 'active_alerts', 'timeline_status', 'timeline'], touch=False
+    )
+    if not dashboard_data:
+        return None
+    return {
+        'reminders': {
+            'reminders': dashboard_data.get('active_reminders', []),
+            'alerts': dashboard_data.get('active_alerts', [])
+        },
+        'timeline_ready': {
+            'timeline_status': dashboard_data.get('timeline_status'),
+            'timeline': dashboard_data.get('timeline')
+        }
+    }
+
+def _notifications_since(user_id, last_id):
+    """Notifications committed after last_id, e.g. by another worker"""
+    try:
+        query = Notification.query.filter(Notification.user_id == user_id)
+        if last_id is None:
+            latest = query.order_by(Notification.id.desc()).first()
+            return [], latest.id if latest else 0
+        notifications = query.filter(Notification.id > last_id).order_by(Notification.id).all()
+        return [n.to_dict() for n in notifications], (notifications[-1].id if notifications else last_id)
+    except Exception as e:
+        print(f"Notification lookup error: {e}")
+        return [], last_id
+    finally:
+        # Don't hold a pooled connection for the life of the stream
+        db.session.remove()
+
+# Each open stream holds a worker thread; past this many, clients are asked to come back later
+_plan_event_slots = threading.BoundedSemaphore(Config.PLAN_EVENTS_MAX_STREAMS)
+
+@app.route('/api/plan-events/<plan_id>')
+def api_plan_events(plan_id):
+    """Server-Sent Events stream of reminder/alert changes, the AI timeline and new notifications"""
+    state = _plan_event_state(plan_id)
+    if state is None:
+        return jsonify({'success': False, 'error': 'Farming plan not found'}), 404
+    
+    user_id = current_user.id if current_user.is_authenticated else None
+    channels = [f"plan:{plan_id}"]
+    if user_id is not None:
+        channels.append(f"user:{user_id}")
+    # Notification events carry their id, so a reconnect resumes where the last stream stopped
+    resume_after = request.headers.get('Last-Event-ID', type=int)
+    
+    def generate():
+        if not _plan_event_slots.acquire(blocking=False):
+            # Keep threads free for ordinary requests; EventSource reconnects after the retry delay
+            yield f"retry: {Config.PLAN_EVENTS_BUSY_RETRY * 1000}\n\n"
+            return
+        
+        subscription = event_bus.subscribe(channels)
+        try:
+            last_sent = dict(state)
+            last_version = farming_journey_service.get_plan_version(plan_id)
+            missed, last_notification_id = [], None
+            if user_id is not None:
+                missed, last_notification_id = _notifications_since(user_id, resume_after)
+            
+            yield f"retry: {Config.PLAN_EVENTS_HEARTBEAT * 1000}\n\n"
+            for event_type, data in state.items():
+                yield _sse_event(event_type, data)
+            for notification in missed:
+                yield _sse_event('notification', notification, notification['id'])
+            
+            opened_at = time.monotonic()
+            while time.monotonic() - opened_at < Config.PLAN_EVENTS_MAX_STREAM:
+                item = subscription.get(timeout=Config.PLAN_EVENTS_HEARTBEAT)
+                if item is not None:
+                    event_type, data = item
+                    if event_type in last_sent:
+                        if last_sent[event_type] == data:
+                            continue
+                        last_sent[event_type] = data
+                    elif event_type == 'notification':
+                        if data['id'] <= (last_notification_id or 0):
+                            continue
+                        last_notification_id = data['id']
+                        yield _sse_event(event_type, data, data['id'])
+                        continue
+                    yield _sse_event(event_type, data)
+                    continue
+                
+                # Quiet period: resync only if another worker changed the plan, then keep the connection alive
+                version = farming_journey_service.get_plan_version(plan_id)
+                if version != last_version:
+                    last_version = version
+                    current = _plan_event_state(plan_id) or {}
+                    for event_type, data in current.items():
+                        if last_sent.get(event_type) != data:
+                            last_sent[event_type] = data
+                            yield _sse_event(event_type, data)
+                # Notifications raised on other workers (for any of the user's plans) never reach this bus
+                if user_id is not None:
+                    notifications, last_notification_id = _notifications_since(user_id, last_notification_id)
+                    for notification in notifications:
+                        yield _sse_event('notification', notification, notification['id'])
+                yield ": keepalive\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+            _plan_event_slots.release()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 # Authentication API endpoints
 @app.route('/api/register', methods=['POST'])
 def api_register():
@@ -458,6 +782,19 @@ def api_mark_notification_read(notification_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/service-stats')
+def api_service_stats():
+    try:
+        return jsonify({
+            'success': True,
+            'api_service': api_service.get_stats(),
+            'ml_service': ml_service.get_stats(),
+            'farming_journey': farming_journey_service.get_stats(),
+            'event_bus': event_bus.get_stats()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/api/test')
 def api_test():
     return jsonify({'message': 'AI AgriConnect API is working!', 'timestamp': datetime.now().isoformat()})
@@ -15,6 +15,10 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Farming plan documents can live in a separate database (e.g. sqlite:///plans.db)
+    PLAN_STORE_DATABASE_URI = os.environ.get('PLAN_STORE_DATABASE_URI') or SQLALCHEMY_DATABASE_URI
+    SQLALCHEMY_BINDS = {'plans': PLAN_STORE_DATABASE_URI}
+    
     # Flask Configuration
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-change-this-in-production'
     
@@ -25,3 +29,82 @@ class Config:
     
     # Session Configuration
     PERMANENT_SESSION_LIFETIME = 86400  # 24 hours
+    
+    # Upstream HTTP Connection Pooling
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 10))  # connections kept per host
+    HTTP_POOL_BLOCK = os.environ.get('HTTP_POOL_BLOCK', 'true').lower() == 'true'  # cap concurrent requests per host at its limit
+    HTTP_POOL_TIMEOUT = float(os.environ.get('HTTP_POOL_TIMEOUT', 5))  # seconds to wait for a free connection
+    HTTP_KEEP_ALIVE = os.environ.get('HTTP_KEEP_ALIVE', 'true').lower() == 'true'
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+    HTTP_BACKOFF_FACTOR = float(os.environ.get('HTTP_BACKOFF_FACTOR', 0.3))
+    HTTP_HOST_LIMITS = {  # max concurrent requests (and pooled connections) per host
+        'api.weatherapi.com': 10,
+        'api.marketstack.com': 5
+    }
+    HTTP_HOST_RETRIES = {  # per-host override of HTTP_MAX_RETRIES
+        'api.marketstack.com': 0  # each market endpoint attempt counts toward its circuit breaker
+    }
+    
+    # Weather Forecast Cache
+    WEATHER_API_TIMEOUT = float(os.environ.get('WEATHER_API_TIMEOUT', 10))  # seconds per forecast request
+    WEATHER_CACHE_SIZE = int(os.environ.get('WEATHER_CACHE_SIZE', 512))  # locations kept in memory
+    WEATHER_CACHE_TTL = int(os.environ.get('WEATHER_CACHE_TTL', 900))  # 15 minutes
+    WEATHER_CACHE_STALE_TTL = int(os.environ.get('WEATHER_CACHE_STALE_TTL', 1800))  # served while refreshing
+    
+    # Market API Resilience
+    MARKET_API_TIMEOUT = float(os.environ.get('MARKET_API_TIMEOUT', 10))
+    MARKET_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('MARKET_BREAKER_FAILURE_THRESHOLD', 3))
+    MARKET_BREAKER_RECOVERY_TIMEOUT = int(os.environ.get('MARKET_BREAKER_RECOVERY_TIMEOUT', 60))  # seconds before a half-open probe
+    MARKET_NEGATIVE_CACHE_TTL = int(os.environ.get('MARKET_NEGATIVE_CACHE_TTL', 60))  # remember failed lookups
+    MARKET_FETCH_MODE = os.environ.get('MARKET_FETCH_MODE', 'sequential')  # sequential, race or hedged
+    MARKET_HEDGE_DELAY = float(os.environ.get('MARKET_HEDGE_DELAY', 0.5))  # seconds before hedging the next endpoint
+    MARKET_FETCH_WORKERS = int(os.environ.get('MARKET_FETCH_WORKERS', 8))
+    
+    # Gemini Advice Cache
+    ADVICE_CACHE_SIZE = int(os.environ.get('ADVICE_CACHE_SIZE', 2000))
+    ADVICE_CACHE_TTL = int(os.environ.get('ADVICE_CACHE_TTL', 86400))  # 24 hours
+    ADVICE_CACHE_PATH = os.environ.get('ADVICE_CACHE_PATH')  # e.g. instance/advice_cache.json; unset disables persistence
+    ADVICE_CACHE_SAVE_INTERVAL = int(os.environ.get('ADVICE_CACHE_SAVE_INTERVAL', 60))  # seconds between disk writes
+    
+    # Farming Plan Creation
+    PLAN_WORKERS = int(os.environ.get('PLAN_WORKERS', 8))  # shared pool for upstream fan-out
+    PLAN_CREATION_DEADLINE = float(os.environ.get('PLAN_CREATION_DEADLINE', 20))  # seconds per plan
+    TIMELINE_WORKERS = int(os.environ.get('TIMELINE_WORKERS', 4))  # background AI timeline jobs, kept off the plan pool
+    CROP_PREDICT_WORKERS = int(os.environ.get('CROP_PREDICT_WORKERS', 2))  # CPU-only crop model, kept off the upstream pool
+    
+    # Farming Plan Store
+    PLAN_STORE_BACKEND = os.environ.get('PLAN_STORE_BACKEND', 'sql')  # sql or memory
+    PLAN_CACHE_SIZE = int(os.environ.get('PLAN_CACHE_SIZE', 1000))  # plans cached per worker
+    PLAN_CACHE_TTL = int(os.environ.get('PLAN_CACHE_TTL', 5))  # seconds before re-reading from the store
+    PLAN_WRITE_BEHIND_INTERVAL = float(os.environ.get('PLAN_WRITE_BEHIND_INTERVAL', 2))  # seconds between progress flushes
+    PLAN_SNAPSHOT_GC_INTERVAL = int(os.environ.get('PLAN_SNAPSHOT_GC_INTERVAL', 3600))  # seconds between sweeps of unreferenced snapshots; 0 disables
+    PLAN_SNAPSHOT_GC_MIN_AGE = int(os.environ.get('PLAN_SNAPSHOT_GC_MIN_AGE', 3600))  # never sweep snapshots younger than this
+    PLAN_DATA_REUSE_SECONDS = int(os.environ.get('PLAN_DATA_REUSE_SECONDS', 900))  # dashboards reuse market data the plan fetched this recently
+    
+    # Progress Event Log
+    PROGRESS_COMPACT_EVERY = int(os.environ.get('PROGRESS_COMPACT_EVERY', 50))  # tail events kept on the plan before compaction
+    PROGRESS_RECENT_EVENTS = int(os.environ.get('PROGRESS_RECENT_EVENTS', 5))  # events kept (and returned) after compaction
+    PROGRESS_BULK_MAX = int(os.environ.get('PROGRESS_BULK_MAX', 500))  # events per bulk update request
+    
+    # Dashboard Snapshot Scheduler
+    DASHBOARD_SCHEDULER_ENABLED = os.environ.get('DASHBOARD_SCHEDULER_ENABLED', 'true').lower() == 'true'
+    DASHBOARD_REFRESH_INTERVAL = int(os.environ.get('DASHBOARD_REFRESH_INTERVAL', 60))  # seconds between refresh cycles
+    DASHBOARD_REFRESH_JITTER = int(os.environ.get('DASHBOARD_REFRESH_JITTER', 10))  # random extra delay per cycle
+    DASHBOARD_REFRESH_WORKERS = int(os.environ.get('DASHBOARD_REFRESH_WORKERS', 4))
+    DASHBOARD_ACTIVE_WINDOW = int(os.environ.get('DASHBOARD_ACTIVE_WINDOW', 1800))  # plans viewed within this window stay active
+    DASHBOARD_SNAPSHOT_MAX_AGE = int(os.environ.get('DASHBOARD_SNAPSHOT_MAX_AGE', 300))  # older snapshots are rebuilt inline
+    
+    # Plan Event Streams (Server-Sent Events)
+    EVENT_QUEUE_SIZE = int(os.environ.get('EVENT_QUEUE_SIZE', 100))  # pending events per open stream
+    PLAN_EVENTS_HEARTBEAT = int(os.environ.get('PLAN_EVENTS_HEARTBEAT', 15))  # seconds between keep-alives/resyncs
+    PLAN_EVENTS_MAX_STREAM = int(os.environ.get('PLAN_EVENTS_MAX_STREAM', 600))  # streams close after this and the browser reconnects
+    PLAN_EVENTS_MAX_STREAMS = int(os.environ.get('PLAN_EVENTS_MAX_STREAMS', 24))  # open streams per worker; keep below GUNICORN_THREADS
+    PLAN_EVENTS_BUSY_RETRY = int(os.environ.get('PLAN_EVENTS_BUSY_RETRY', 60))  # seconds before a turned-away stream reconnects
+    
+    # Batch Crop Recommendation
+    CROP_BATCH_MAX = int(os.environ.get('CROP_BATCH_MAX', 5000))  # soil profiles per request
+    CROP_BATCH_CHUNK = int(os.environ.get('CROP_BATCH_CHUNK', 500))  # profiles scored per forest pass while streaming
+    
+    # Crop Prediction Memo
+    CROP_MEMO_SIZE = int(os.environ.get('CROP_MEMO_SIZE', 4096))  # distinct soil profiles remembered per worker
+    CROP_MEMO_QUANTIZE = os.environ.get('CROP_MEMO_QUANTIZE', 'false').lower() == 'true'  # snap inputs to form precision
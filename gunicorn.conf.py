@@ -0,0 +1,31 @@
+# Gunicorn settings, picked up automatically by: gunicorn app:app
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Each open plan event stream holds a thread while it waits; PLAN_EVENTS_MAX_STREAMS
+# caps them per worker so the remaining threads keep serving ordinary requests
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 32))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+
+# Import the app (and load the ML models) once in the master; workers
+# inherit those pages copy-on-write instead of each unpickling its own copy.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+
+def pre_fork(server, worker):
+    # Keep the cyclic GC from writing to (and so copying) preloaded objects
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Database connections opened while importing the app belong to the master
+    if preload_app:
+        from app import app
+        from models import db
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
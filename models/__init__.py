@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 
 from flask_login import UserMixin
@@ -96,6 +97,58 @@ class FarmingPlan(db.Model):
         }
 
 
+class FarmingPlanDocument(db.Model):
+    """Full farming journey plan state shared by every worker"""
+    __tablename__ = 'farming_plan_documents'
+    __bind_key__ = 'plans'
+
+    id = db.Column(db.Integer, primary_key=True)
+    plan_id = db.Column(db.String(128), unique=True, nullable=False, index=True)
+    payload = db.Column(db.Text(length=2**32 - 1), nullable=False)  # JSON; LONGTEXT on MySQL
+    version = db.Column(db.Integer, default=1, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'plan_id': self.plan_id,
+            'version': self.version,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class PlanSnapshot(db.Model):
+    """Weather or market payload shared by plans, addressed by its sha256"""
+    __tablename__ = 'plan_snapshots'
+    __bind_key__ = 'plans'
+
+    id = db.Column(db.Integer, primary_key=True)
+    digest = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    payload = db.Column(db.Text(length=2**32 - 1), nullable=False)  # JSON; LONGTEXT on MySQL
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ProgressEvent(db.Model):
+    """One farming progress update, appended to a plan's history"""
+    __tablename__ = 'plan_progress_events'
+    __bind_key__ = 'plans'
+    # seq is allocated per plan in the database; the constraint rejects a second writer's duplicate
+    __table_args__ = (db.UniqueConstraint('plan_id', 'seq', name='uq_plan_progress_events_plan_seq'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    plan_id = db.Column(db.String(128), nullable=False)
+    seq = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        event = json.loads(self.payload)
+        event['seq'] = self.seq
+        return event
+
+
 class Notification(db.Model):
     __tablename__ = 'notifications'
 
@@ -1,13 +1,23 @@
-import requests
 import google.generativeai as genai
 import json
+import hashlib
+import time
 import pandas as pd
 from datetime import datetime, timedelta
 import os
+import atexit
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
+from config import Config
+from http_client import PooledHTTPClient
+from cache import TTLCache
+from circuit_breaker import CircuitBreaker
+from prompt_features import summarize_weather, summarize_market
 
 load_dotenv()
 
+GEMINI_FALLBACK_MESSAGE = "I'm sorry, I'm having trouble connecting right now. Please try again later."
+
 class APIService:
     def __init__(self):
         # Initialize APIs
@@ -22,60 +32,237 @@ class APIService:
         # API endpoints
         self.weather_base_url = "http://api.weatherapi.com/v1"
         self.market_base_url = "https://api.marketstack.com/v1"
+        
+        # Shared keep-alive connection pools for upstream APIs
+        self.http = PooledHTTPClient(
+            pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+            pool_block=Config.HTTP_POOL_BLOCK,
+            pool_timeout=Config.HTTP_POOL_TIMEOUT,
+            keep_alive=Config.HTTP_KEEP_ALIVE,
+            max_retries=Config.HTTP_MAX_RETRIES,
+            backoff_factor=Config.HTTP_BACKOFF_FACTOR,
+            host_limits=Config.HTTP_HOST_LIMITS,
+            host_retries=Config.HTTP_HOST_RETRIES
+        )
+        
+        # In-process forecast cache keyed by normalized location
+        self.weather_cache = TTLCache(
+            maxsize=Config.WEATHER_CACHE_SIZE,
+            ttl=Config.WEATHER_CACHE_TTL,
+            stale_ttl=Config.WEATHER_CACHE_STALE_TTL,
+            name='weather'
+        )
+        self.weather_window_slices = 0
+        
+        # Market endpoints, each guarded by its own circuit breaker
+        self.market_endpoints = [
+            f"{self.market_base_url}/tickers",
+            f"{self.market_base_url}/eod",
+            f"{self.market_base_url}/intraday"
+        ]
+        self.market_breakers = {
+            endpoint: CircuitBreaker(
+                endpoint,
+                failure_threshold=Config.MARKET_BREAKER_FAILURE_THRESHOLD,
+                recovery_timeout=Config.MARKET_BREAKER_RECOVERY_TIMEOUT
+            )
+            for endpoint in self.market_endpoints
+        }
+        self.market_last_good_endpoint = None
+        self.market_negative_cache = TTLCache(
+            maxsize=1024,
+            ttl=Config.MARKET_NEGATIVE_CACHE_TTL,
+            name='market_negative'
+        )
+        
+        # Concurrent endpoint racing (MARKET_FETCH_MODE = race/hedged)
+        self.market_fetch_mode = Config.MARKET_FETCH_MODE
+        self.market_hedge_delay = Config.MARKET_HEDGE_DELAY
+        self.market_executor = ThreadPoolExecutor(
+            max_workers=Config.MARKET_FETCH_WORKERS,
+            thread_name_prefix='market-fetch'
+        )
+        self.market_endpoint_wins = {endpoint: 0 for endpoint in self.market_endpoints}
+        
+        # Gemini advice cache keyed on canonical structured inputs
+        self.advice_cache = TTLCache(
+            maxsize=Config.ADVICE_CACHE_SIZE,
+            ttl=Config.ADVICE_CACHE_TTL,
+            name='advice'
+        )
+        self._advice_cache_saved_at = 0.0
+        
+        # Prompt payload sizes before/after feature extraction
+        self.prompt_size_stats = {'prompts': 0, 'raw_chars': 0, 'compact_chars': 0}
+        
+        # Time-to-first-byte of streamed advice responses
+        self.stream_stats = {'streams': 0, 'ttfb_total_ms': 0.0, 'ttfb_max_ms': 0.0, 'ttfb_last_ms': None}
+        if Config.ADVICE_CACHE_PATH:
+            try:
+                self.advice_cache.load(Config.ADVICE_CACHE_PATH)
+            except Exception as e:
+                print(f"Advice cache load error: {e}")
+            # An unreadable file is replaced on exit rather than disabling persistence
+            atexit.register(self._persist_advice_cache, True)
     
     def get_weather_data(self, location="Delhi", days=7):
         """Get weather forecast data"""
         try:
-            url = f"{self.weather_base_url}/forecast.json"
-            params = {
-                'key': self.weather_api_key,
-                'q': location,
-                'days': days,
-                'aqi': 'yes',
-                'alerts': 'yes'
-            }
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            return response.json()
+            days = int(days)
+            key = self._normalize_location(location)
+            
+            # One entry per location holds the longest horizon fetched so far;
+            # shorter windows are sliced from it instead of calling upstream.
+            cached = self.weather_cache.peek(key)
+            horizon = max(days, cached['days']) if cached else days
+            entry = self.weather_cache.get_or_load(
+                key,
+                lambda: {'days': horizon, 'data': self._fetch_weather_data(location, horizon)},
+                accept=lambda e: e['days'] >= days
+            )
+            return self._slice_forecast(entry, days)
         except Exception as e:
             print(f"Weather API Error: {e}")
             return self._get_mock_weather_data()
     
+    def _fetch_weather_data(self, location, days):
+        """Fetch a forecast from the weather API, raising on failure"""
+        url = f"{self.weather_base_url}/forecast.json"
+        params = {
+            'key': self.weather_api_key,
+            'q': location,
+            'days': days,
+            'aqi': 'yes',
+            'alerts': 'yes'
+        }
+        response = self.http.get(url, params=params, timeout=Config.WEATHER_API_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+    
+    def _slice_forecast(self, entry, days):
+        """Return the first ``days`` forecast days of a cached longer forecast"""
+        data = entry['data']
+        if entry['days'] == days or 'forecast' not in data:
+            return data
+        
+        self.weather_window_slices += 1
+        sliced = dict(data)
+        sliced['forecast'] = dict(data['forecast'])
+        sliced['forecast']['forecastday'] = data['forecast'].get('forecastday', [])[:days]
+        return sliced
+    
+    def _normalize_location(self, location):
+        """Normalize a location so case and spacing variants share a cache entry"""
+        return ' '.join(str(location or 'Delhi').lower().replace(',', ' , ').split()).replace(' ,', ',')
+    
     def get_market_prices(self, crop_name="wheat", limit=10):
         """Get market prices for crops"""
         try:
-            # Try different endpoints for market data
-            endpoints = [
-                f"{self.market_base_url}/tickers",
-                f"{self.market_base_url}/eod",
-                f"{self.market_base_url}/intraday"
-            ]
+            symbol = crop_name.upper()
+            negative_key = (symbol, limit)
             
-            for endpoint in endpoints:
-                try:
-                    params = {
-                        'access_key': self.market_api_key,
-                        'symbols': crop_name.upper(),
-                        'limit': limit
-                    }
-                    response = requests.get(endpoint, params=params, timeout=10)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if 'data' in data and data['data']:
-                        return data
-                        
-                except Exception as e:
-                    print(f"Market API endpoint {endpoint} failed: {e}")
-                    continue
+            # A recent lookup found nothing anywhere; don't wait on upstream again
+            if self.market_negative_cache.get(negative_key):
+                return self._get_mock_market_data()
             
-            # If all endpoints fail, return mock data
+            endpoints = self._ordered_market_endpoints()
+            if self.market_fetch_mode in ('race', 'hedged'):
+                data, endpoint = self._race_market_endpoints(endpoints, symbol, limit)
+            else:
+                data, endpoint = None, None
+                for candidate in endpoints:
+                    data = self._fetch_market_guarded(candidate, symbol, limit)
+                    if data:
+                        endpoint = candidate
+                        break
+            
+            if data:
+                self.market_last_good_endpoint = endpoint
+                self.market_endpoint_wins[endpoint] += 1
+                return data
+            
+            # If all endpoints fail, remember it briefly and return mock data
+            self.market_negative_cache.set(negative_key, True)
             return self._get_mock_market_data()
             
         except Exception as e:
             print(f"Market API Error: {e}")
             return self._get_mock_market_data()
     
+    def _ordered_market_endpoints(self):
+        """Market endpoints with the last one that returned data tried first"""
+        last_good = self.market_last_good_endpoint
+        if last_good is None:
+            return list(self.market_endpoints)
+        return [last_good] + [e for e in self.market_endpoints if e != last_good]
+    
+    def _race_market_endpoints(self, endpoints, symbol, limit):
+        """Fire endpoints concurrently (or hedged after a delay) and keep the first with data"""
+        queue = list(endpoints)
+        futures = {}
+        pending = set()
+        
+        def launch():
+            # The breaker is consulted in the worker, so a cancelled queued future never holds a probe
+            endpoint = queue.pop(0)
+            future = self.market_executor.submit(self._fetch_market_guarded, endpoint, symbol, limit)
+            futures[future] = endpoint
+            pending.add(future)
+        
+        hedged = self.market_fetch_mode == 'hedged'
+        if hedged and queue:
+            launch()
+        else:
+            while queue:
+                launch()
+        
+        while pending:
+            timeout = self.market_hedge_delay if hedged and queue else None
+            done, not_done = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            pending.intersection_update(not_done)
+            
+            for future in done:
+                data = future.result()
+                if data:
+                    # Running losers still record into their breakers; queued ones never touched them
+                    for loser in pending:
+                        loser.cancel()
+                    return data, futures[future]
+            
+            # Either the hedge delay passed or an endpoint came back empty
+            if hedged and queue:
+                launch()
+        
+        return None, None
+    
+    def _fetch_market_guarded(self, endpoint, symbol, limit):
+        """Fetch one endpoint through its breaker; returns data only when non-empty"""
+        breaker = self.market_breakers[endpoint]
+        if not breaker.allow_request():
+            return None
+        try:
+            data = self._fetch_market_endpoint(endpoint, symbol, limit)
+            breaker.record_success()
+        except Exception as e:
+            breaker.record_failure()
+            print(f"Market API endpoint {endpoint} failed: {e}")
+            return None
+        
+        if 'data' in data and data['data']:
+            return data
+        return None
+    
+    def _fetch_market_endpoint(self, endpoint, symbol, limit):
+        """Fetch one market endpoint, raising on failure"""
+        params = {
+            'access_key': self.market_api_key,
+            'symbols': symbol,
+            'limit': limit
+        }
+        response = self.http.get(endpoint, params=params, timeout=Config.MARKET_API_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+    
     def get_gemini_response(self, prompt, max_tokens=500):
         """Get AI response from Gemini"""
         try:
@@ -83,15 +270,106 @@ class APIService:
             return response.text
         except Exception as e:
             print(f"Gemini API Error: {e}")
-            return "I'm sorry, I'm having trouble connecting right now. Please try again later."
+            return GEMINI_FALLBACK_MESSAGE
+    
+    def _get_cached_advice(self, kind, inputs, build_prompt):
+        """Answer from the advice cache, calling Gemini only for new questions"""
+        key = self._advice_cache_key(kind, inputs)
+        cached = self.advice_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        text = self.get_gemini_response(build_prompt())
+        if text != GEMINI_FALLBACK_MESSAGE:
+            self._store_advice(key, text)
+        return text
+    
+    def _stream_cached_advice(self, kind, inputs, build_prompt):
+        """Yield advice text as Gemini produces it; cached answers arrive as one chunk"""
+        key = self._advice_cache_key(kind, inputs)
+        cached = self.advice_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        try:
+            for chunk in self.gemini_model.generate_content(build_prompt(), stream=True):
+                text = chunk.text
+                if text:
+                    parts.append(text)
+                    yield text
+        except Exception as e:
+            print(f"Gemini API Error: {e}")
+            if not parts:
+                yield GEMINI_FALLBACK_MESSAGE
+            return
+        
+        self._store_advice(key, ''.join(parts))
+    
+    def _store_advice(self, key, text):
+        """Cache a complete advice answer"""
+        self.advice_cache.set(key, text)
+        self._persist_advice_cache()
+    
+    def record_stream_ttfb(self, seconds):
+        """Record time from request start to the first streamed advice chunk"""
+        ttfb_ms = seconds * 1000
+        stats = self.stream_stats
+        stats['streams'] += 1
+        stats['ttfb_total_ms'] += ttfb_ms
+        stats['ttfb_max_ms'] = max(stats['ttfb_max_ms'], ttfb_ms)
+        stats['ttfb_last_ms'] = ttfb_ms
+    
+    def _advice_cache_key(self, kind, inputs):
+        """Stable key for an advice function's structured inputs"""
+        canonical = json.dumps(self._canonicalize(inputs), sort_keys=True, separators=(',', ':'))
+        return f"{kind}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+    
+    def _canonicalize(self, value):
+        """Normalize inputs so trivially different questions share a cache entry"""
+        if isinstance(value, dict):
+            return {str(k).strip().lower(): self._canonicalize(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._canonicalize(v) for v in value]
+        if isinstance(value, bool) or value is None:
+            return value
+        if isinstance(value, (int, float)):
+            value = round(float(value), 4)
+            return int(value) if value.is_integer() else value
+        return ' '.join(str(value).lower().split())
+    
+    def _persist_advice_cache(self, force=False):
+        """Write the advice cache to disk, at most once per save interval"""
+        if not Config.ADVICE_CACHE_PATH:
+            return
+        now = time.monotonic()
+        if not force and now - self._advice_cache_saved_at < Config.ADVICE_CACHE_SAVE_INTERVAL:
+            return
+        self._advice_cache_saved_at = now
+        try:
+            self.advice_cache.dump(Config.ADVICE_CACHE_PATH)
+        except Exception as e:
+            print(f"Advice cache save error: {e}")
     
     def get_crop_recommendation(self, soil_data, weather_data, budget):
         """Get AI-powered crop recommendation"""
-        prompt = f"""
+        weather_summary = summarize_weather(weather_data)
+        inputs = {'soil_data': soil_data, 'weather': weather_summary, 'budget': budget}
+        
+        def build_prompt():
+            self._record_prompt_size([weather_data], [weather_summary])
+            return self._build_crop_recommendation_prompt(soil_data, weather_summary, budget)
+        
+        return self._get_cached_advice('crop_recommendation', inputs, build_prompt)
+    
+    def _build_crop_recommendation_prompt(self, soil_data, weather_summary, budget):
+        """Build the crop recommendation prompt"""
+        return f"""
         As an agricultural expert, analyze the following data and provide crop recommendations:
         
         Soil Data: {soil_data}
-        Weather Forecast: {weather_data}
+        Weather Forecast Summary: {weather_summary}
         Budget: ₹{budget}
         
         Please provide:
@@ -104,11 +382,26 @@ class APIService:
         
         Format your response in a clear, actionable way for farmers.
         """
-        return self.get_gemini_response(prompt)
     
     def get_financial_advice(self, farmer_query, financial_data=None):
         """Get financial literacy advice"""
-        base_prompt = f"""
+        inputs = {'query': farmer_query, 'financial_data': financial_data or {}}
+        return self._get_cached_advice(
+            'financial_advice', inputs,
+            lambda: self._build_financial_advice_prompt(farmer_query, financial_data)
+        )
+    
+    def stream_financial_advice(self, farmer_query, financial_data=None):
+        """Stream financial literacy advice chunk by chunk"""
+        inputs = {'query': farmer_query, 'financial_data': financial_data or {}}
+        return self._stream_cached_advice(
+            'financial_advice', inputs,
+            lambda: self._build_financial_advice_prompt(farmer_query, financial_data)
+        )
+    
+    def _build_financial_advice_prompt(self, farmer_query, financial_data=None):
+        """Build the financial advice prompt"""
+        return f"""
         You are a financial advisor specializing in agriculture. A farmer is asking: "{farmer_query}"
         
         Financial Context: {financial_data or "No specific financial data provided"}
@@ -122,11 +415,26 @@ class APIService:
         
         Keep the language simple and farmer-friendly.
         """
-        return self.get_gemini_response(base_prompt)
     
     def get_pest_disease_advice(self, crop_name, symptoms, weather_conditions):
         """Get pest and disease management advice"""
-        prompt = f"""
+        inputs = {'crop': crop_name, 'symptoms': symptoms, 'weather_conditions': weather_conditions}
+        return self._get_cached_advice(
+            'pest_disease_advice', inputs,
+            lambda: self._build_pest_disease_prompt(crop_name, symptoms, weather_conditions)
+        )
+    
+    def stream_pest_disease_advice(self, crop_name, symptoms, weather_conditions):
+        """Stream pest and disease management advice chunk by chunk"""
+        inputs = {'crop': crop_name, 'symptoms': symptoms, 'weather_conditions': weather_conditions}
+        return self._stream_cached_advice(
+            'pest_disease_advice', inputs,
+            lambda: self._build_pest_disease_prompt(crop_name, symptoms, weather_conditions)
+        )
+    
+    def _build_pest_disease_prompt(self, crop_name, symptoms, weather_conditions):
+        """Build the pest and disease prompt"""
+        return f"""
         As an agricultural expert, help with pest/disease management:
         
         Crop: {crop_name}
@@ -142,16 +450,37 @@ class APIService:
         
         Focus on organic and low-cost solutions first.
         """
-        return self.get_gemini_response(prompt)
     
     def get_harvesting_advice(self, crop_name, weather_forecast, market_prices):
         """Get harvesting timing and selling advice"""
-        prompt = f"""
+        kind, inputs, build_prompt = self._harvesting_advice_request(crop_name, weather_forecast, market_prices)
+        return self._get_cached_advice(kind, inputs, build_prompt)
+    
+    def stream_harvesting_advice(self, crop_name, weather_forecast, market_prices):
+        """Stream harvesting timing and selling advice chunk by chunk"""
+        kind, inputs, build_prompt = self._harvesting_advice_request(crop_name, weather_forecast, market_prices)
+        return self._stream_cached_advice(kind, inputs, build_prompt)
+    
+    def _harvesting_advice_request(self, crop_name, weather_forecast, market_prices):
+        """Cache inputs and prompt builder shared by the blocking and streaming variants"""
+        weather_summary = summarize_weather(weather_forecast)
+        market_summary = summarize_market(market_prices)
+        inputs = {'crop': crop_name, 'weather': weather_summary, 'market': market_summary}
+        
+        def build_prompt():
+            self._record_prompt_size([weather_forecast, market_prices], [weather_summary, market_summary])
+            return self._build_harvesting_prompt(crop_name, weather_summary, market_summary)
+        
+        return 'harvesting_advice', inputs, build_prompt
+    
+    def _build_harvesting_prompt(self, crop_name, weather_summary, market_summary):
+        """Build the harvesting advice prompt"""
+        return f"""
         Help a farmer decide when to harvest and sell:
         
         Crop: {crop_name}
-        Weather Forecast: {weather_forecast}
-        Current Market Prices: {market_prices}
+        Weather Forecast Summary: {weather_summary}
+        Current Market Prices: {market_summary}
         
         Please advise:
         1. Optimal harvesting time
@@ -162,7 +491,51 @@ class APIService:
         
         Consider weather impact on crop quality and market demand.
         """
-        return self.get_gemini_response(prompt)
+    
+    def _record_prompt_size(self, raw_payloads, compact_payloads):
+        """Track how much prompt text feature extraction saves"""
+        self.prompt_size_stats['prompts'] += 1
+        self.prompt_size_stats['raw_chars'] += sum(len(str(p)) for p in raw_payloads)
+        self.prompt_size_stats['compact_chars'] += sum(len(str(p)) for p in compact_payloads)
+    
+    def get_stats(self):
+        """Get upstream connection and cache statistics"""
+        return {
+            'http': self.http.get_stats(),
+            'weather_cache': self.weather_cache.get_stats(),
+            'weather_window_slices': self.weather_window_slices,
+            'market_breakers': {e: b.get_stats() for e, b in self.market_breakers.items()},
+            'market_last_good_endpoint': self.market_last_good_endpoint,
+            'market_fetch_mode': self.market_fetch_mode,
+            'market_endpoint_wins': dict(self.market_endpoint_wins),
+            'market_negative_cache': self.market_negative_cache.get_stats(),
+            'advice_cache': self.advice_cache.get_stats(),
+            'prompt_size': self._get_prompt_size_stats(),
+            'streaming': self._get_stream_stats()
+        }
+    
+    def _get_stream_stats(self):
+        stats = dict(self.stream_stats)
+        stats['ttfb_avg_ms'] = round(stats['ttfb_total_ms'] / stats['streams'], 1) if stats['streams'] else None
+        return stats
+    
+    def _get_prompt_size_stats(self):
+        """Payload characters and rough token estimate (~4 chars/token) before and after summarizing"""
+        stats = dict(self.prompt_size_stats)
+        stats['raw_tokens_est'] = stats['raw_chars'] // 4
+        stats['compact_tokens_est'] = stats['compact_chars'] // 4
+        stats['reduction_percent'] = round(
+            (1 - stats['compact_chars'] / stats['raw_chars']) * 100, 1
+        ) if stats['raw_chars'] else 0.0
+        return stats
+    
+    def get_fallback_weather_data(self):
+        """Weather data to use when the real fetch can't be waited for"""
+        return self._get_mock_weather_data()
+    
+    def get_fallback_market_data(self):
+        """Market data to use when the real fetch can't be waited for"""
+        return self._get_mock_market_data()
     
     def _get_mock_weather_data(self):
         """Fallback weather data"""
@@ -0,0 +1,175 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache with TTL expiry and stale-while-revalidate; ttl=None never expires"""
+
+    def __init__(self, maxsize=256, ttl=600, stale_ttl=0, name='cache'):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'rejected': 0,
+            'refreshes': 0,
+            'refresh_errors': 0
+        }
+
+    def get(self, key, default=None):
+        """Get a fresh value, or default when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._fresh(self._age(entry)):
+                self._stats['misses'] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def set(self, key, value):
+        """Store a value and evict least recently used entries over maxsize"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def peek(self, key):
+        """Get a value regardless of age without touching LRU order or stats"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def get_or_load(self, key, loader, accept=None):
+        """Serve from cache, refreshing stale entries in the background
+
+        ``accept`` optionally decides whether a cached value can answer this
+        lookup; a rejected value is reloaded synchronously like a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and accept is not None and not accept(entry[0]):
+                self._stats['rejected'] += 1
+                entry = None
+            if entry is not None:
+                age = self._age(entry)
+                if self._fresh(age):
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return entry[0]
+                if self._servable(age):
+                    self._entries.move_to_end(key)
+                    self._stats['stale_hits'] += 1
+                    self._start_refresh(key, loader)
+                    return entry[0]
+                del self._entries[key]
+                self._stats['expirations'] += 1
+            self._stats['misses'] += 1
+
+        value = loader()
+        self.set(key, value)
+        return value
+
+    def _start_refresh(self, key, loader):
+        """Run at most one background refresh per key (caller holds the lock)"""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self._stats['refreshes'] += 1
+        thread = threading.Thread(target=self._refresh, args=(key, loader), daemon=True)
+        thread.start()
+
+    def _refresh(self, key, loader):
+        try:
+            self.set(key, loader())
+        except Exception as e:
+            print(f"Cache refresh error ({self.name}): {e}")
+            with self._lock:
+                self._stats['refresh_errors'] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _age(self, entry):
+        return time.monotonic() - entry[1]
+
+    def _fresh(self, age):
+        return self.ttl is None or age < self.ttl
+
+    def _servable(self, age):
+        """Fresh, or stale but still within stale_ttl"""
+        return self.ttl is None or age < self.ttl + self.stale_ttl
+
+    def invalidate(self, key):
+        """Drop a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def dump(self, path):
+        """Atomically write unexpired entries to a JSON file (string keys only)"""
+        now_mono, now_wall = time.monotonic(), time.time()
+        with self._lock:
+            entries = [
+                [key, value, now_wall - (now_mono - stored_at)]
+                for key, (value, stored_at) in self._entries.items()
+                if self._servable(now_mono - stored_at)
+            ]
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"  # workers may dump concurrently at exit
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """Load entries written by dump(), skipping ones that have since expired"""
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)
+
+        now_mono, now_wall = time.monotonic(), time.time()
+        loaded = 0
+        with self._lock:
+            for key, value, stored_wall in entries:
+                age = now_wall - stored_wall
+                if not self._servable(age):
+                    continue
+                self._entries[key] = (value, now_mono - age)
+                loaded += 1
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return loaded
+
+    def get_stats(self):
+        """Hit/miss/eviction counters and current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['maxsize'] = self.maxsize
+        stats['ttl'] = self.ttl
+        stats['stale_ttl'] = self.stale_ttl
+        stats['hit_rate'] = round((stats['hits'] + stats['stale_hits']) / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,133 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from request_memo import RequestMemo
+
+
+class DashboardScheduler:
+    """Periodically precomputes the expensive dashboard sections of active plans
+
+    Plans become active when they are created or viewed and drop out after
+    ``active_window`` seconds without a view. Each cycle groups active plans
+    by location so a batch shares one weather fetch and one memo.
+    """
+
+    SNAPSHOT_SECTIONS = ['current_weather', 'current_market', 'price_prediction',
+                         'crop_health_score', 'financial_summary']
+
+    def __init__(self, service, interval=60, jitter=10, workers=4, active_window=1800, max_age=300):
+        self.service = service
+        self.interval = interval
+        self.jitter = jitter
+        self.workers = workers
+        self.active_window = active_window
+        self.max_age = max_age
+
+        self._active = {}  # plan_id -> last access (monotonic)
+        self._snapshots = {}  # plan_id -> (sections, built_at)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_pid = None
+        self._stats = {'cycles': 0, 'batches': 0, 'snapshots_built': 0, 'snapshot_errors': 0,
+                       'snapshot_hits': 0, 'snapshot_misses': 0, 'last_cycle_ms': None}
+
+    def touch(self, plan_id):
+        """Mark a plan as active and make sure the refresh loop is running"""
+        with self._lock:
+            self._active[plan_id] = time.monotonic()
+        self._ensure_running()
+
+    def get_snapshot(self, plan_id):
+        """Return (sections, age_seconds) if a fresh enough snapshot exists"""
+        with self._lock:
+            snapshot = self._snapshots.get(plan_id)
+        if snapshot is None:
+            self._stats['snapshot_misses'] += 1
+            return None
+
+        sections, built_at = snapshot
+        age = time.monotonic() - built_at
+        if age > self.max_age:
+            self._stats['snapshot_misses'] += 1
+            return None
+        self._stats['snapshot_hits'] += 1
+        return sections, age
+
+    def store_snapshot(self, plan_id, sections):
+        with self._lock:
+            self._snapshots[plan_id] = (sections, time.monotonic())
+
+    def run_once(self):
+        """Refresh snapshots for every active plan, batched by location"""
+        started_at = time.monotonic()
+        batches = self._active_batches()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='dashboard-snapshot') as pool:
+            for location, plan_ids in batches.items():
+                pool.submit(self._refresh_batch, location, plan_ids)
+
+        self._stats['cycles'] += 1
+        self._stats['batches'] += len(batches)
+        self._stats['last_cycle_ms'] = (time.monotonic() - started_at) * 1000
+
+    def _active_batches(self):
+        """Group active plans by location, forgetting plans idle past the window"""
+        now = time.monotonic()
+        with self._lock:
+            for plan_id, last_access in list(self._active.items()):
+                if now - last_access > self.active_window:
+                    del self._active[plan_id]
+                    self._snapshots.pop(plan_id, None)
+            plan_ids = list(self._active.keys())
+
+        batches = {}
+        for plan_id in plan_ids:
+            plan = self.service.plan_store.get(plan_id)
+            if plan is None:
+                continue
+            location = plan['farmer_data'].get('location', 'Delhi')
+            batches.setdefault(location, []).append(plan_id)
+        return batches
+
+    def _refresh_batch(self, location, plan_ids):
+        # Plans in the same location share weather, market and price lookups
+        memo = RequestMemo()
+        for plan_id in plan_ids:
+            try:
+                sections = self.service._build_dashboard(plan_id, fields=self.SNAPSHOT_SECTIONS, memo=memo)
+                if sections is not None:
+                    sections.pop('plan_id', None)
+                    self.store_snapshot(plan_id, sections)
+                    self._stats['snapshots_built'] += 1
+            except Exception as e:
+                print(f"Dashboard snapshot error for {plan_id}: {e}")
+                self._stats['snapshot_errors'] += 1
+
+    def _ensure_running(self):
+        """Start the loop lazily so each forked worker runs its own"""
+        if self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+            self._thread = threading.Thread(target=self._loop, name='dashboard-scheduler', daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            # Jitter keeps workers from refreshing (and hitting upstream) in lockstep
+            time.sleep(self.interval + random.uniform(0, self.jitter))
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Dashboard scheduler error: {e}")
+
+    def get_stats(self):
+        stats = dict(self._stats)
+        with self._lock:
+            stats['active_plans'] = len(self._active)
+            stats['snapshots'] = len(self._snapshots)
+        return stats
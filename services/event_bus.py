@@ -0,0 +1,96 @@
+import queue
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import Config
+
+
+class Subscription:
+    """One open client stream listening on a set of channels"""
+
+    def __init__(self, channels, max_queue):
+        self.channels = set(channels)
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def get(self, timeout):
+        """Next (event, data) pair, or None if nothing arrived before the timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """In-process publish/subscribe used to push plan and user events to open streams
+
+    Channels are plain strings such as ``plan:<plan_id>`` or ``user:<id>``.
+    Subscribers that fall behind drop events instead of blocking publishers.
+    """
+
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._channels = {}  # channel -> set of subscriptions
+        self._lock = threading.Lock()
+        self._stats = {'published': 0, 'delivered': 0, 'dropped': 0}
+
+    def subscribe(self, channels):
+        subscription = Subscription(channels, self.max_queue)
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is None:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[channel]
+
+    def publish(self, channel, event_type, data):
+        """Deliver an event to every subscriber of a channel"""
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        self._stats['published'] += 1
+
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait((event_type, data))
+                self._stats['delivered'] += 1
+            except queue.Full:
+                # Slow client; it resynchronizes on its next heartbeat
+                subscription.dropped += 1
+                self._stats['dropped'] += 1
+
+    def watch_notifications(self, notification_model):
+        """Publish Notification rows to ``user:<id>`` once their transaction commits"""
+        @event.listens_for(notification_model, 'after_insert')
+        def _queue_notification(mapper, connection, target):
+            session = Session.object_session(target)
+            if session is not None:
+                session.info.setdefault('pending_notifications', []).append(target.to_dict())
+
+        @event.listens_for(Session, 'after_commit')
+        def _publish_notifications(session):
+            for notification in session.info.pop('pending_notifications', []):
+                self.publish(f"user:{notification['user_id']}", 'notification', notification)
+
+        @event.listens_for(Session, 'after_rollback')
+        def _discard_notifications(session):
+            session.info.pop('pending_notifications', None)
+
+    def get_stats(self):
+        stats = dict(self._stats)
+        with self._lock:
+            stats['channels'] = len(self._channels)
+            stats['subscribers'] = len({id(s) for subs in self._channels.values() for s in subs})
+        return stats
+
+# Initialize the event bus
+event_bus = EventBus(max_queue=Config.EVENT_QUEUE_SIZE)
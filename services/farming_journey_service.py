@@ -1,66 +1,212 @@
 import json
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
+from config import Config
 from api_service import api_service
 from ml_service import ml_service
+from auth_service import auth_service
+from plan_store import MemoryPlanStore, SQLPlanStore
+from request_memo import RequestMemo
+from reminder_engine import ReminderEngine
+from dashboard_scheduler import DashboardScheduler
 
 class FarmingJourneyService:
     def __init__(self):
         self.api_service = api_service
         self.ml_service = ml_service
-        self.farming_plans = {}  # Store farming plans
+        self.app = None
+        self._listeners = []
+        self.plan_store = MemoryPlanStore()  # replaced by init_app()
+        self.reminder_engine = ReminderEngine()
+        self.scheduler = None
+        if Config.DASHBOARD_SCHEDULER_ENABLED:
+            self.scheduler = DashboardScheduler(
+                self,
+                interval=Config.DASHBOARD_REFRESH_INTERVAL,
+                jitter=Config.DASHBOARD_REFRESH_JITTER,
+                workers=Config.DASHBOARD_REFRESH_WORKERS,
+                active_window=Config.DASHBOARD_ACTIVE_WINDOW,
+                max_age=Config.DASHBOARD_SNAPSHOT_MAX_AGE
+            )
+        
+        # Bounded pool for concurrent upstream calls during plan creation
+        self.executor = ThreadPoolExecutor(max_workers=Config.PLAN_WORKERS, thread_name_prefix='farming-plan')
+        # Slow Gemini timeline jobs get their own pool so they can't starve plan creation's deadline
+        self.timeline_executor = ThreadPoolExecutor(max_workers=Config.TIMELINE_WORKERS, thread_name_prefix='farming-timeline')
+        # The crop model never waits on upstream, so a hung API can't push plans onto the fallback crop
+        self.crop_executor = ThreadPoolExecutor(max_workers=Config.CROP_PREDICT_WORKERS, thread_name_prefix='farming-crop')
+        self.stats = {
+            'plans_created': 0,
+            'plan_creation_ms_total': 0.0,
+            'plan_creation_ms_last': None,
+            'deadline_fallbacks': 0,
+            'timelines_generated': 0,
+            'timeline_fallbacks': 0,
+            'timeline_job_ms_last': None,
+            'progress_events': 0,
+            'progress_compactions': 0,
+            'dashboards_built': 0,
+            'memo_computed': 0,
+            'memo_reused': 0,
+            'memo_seeded': 0,
+            'last_dashboard_memo': None
+        }
+    
+    def init_app(self, app):
+        """Switch to the shared plan store configured for the Flask app"""
+        self.app = app
+        if Config.PLAN_STORE_BACKEND == 'sql':
+            self.plan_store = SQLPlanStore(
+                app,
+                cache_size=Config.PLAN_CACHE_SIZE,
+                cache_ttl=Config.PLAN_CACHE_TTL,
+                flush_interval=Config.PLAN_WRITE_BEHIND_INTERVAL,
+                snapshot_gc_interval=Config.PLAN_SNAPSHOT_GC_INTERVAL,
+                snapshot_gc_min_age=Config.PLAN_SNAPSHOT_GC_MIN_AGE
+            )
     
     def create_farming_plan(self, farmer_data):
         """Create a comprehensive farming plan from initial input"""
         try:
-            # Generate unique plan ID
-            plan_id = f"plan_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            started_at = time.monotonic()
+            deadline = started_at + Config.PLAN_CREATION_DEADLINE
             
-            # Get initial crop recommendation
-            crop_recommendation = self.ml_service.predict_crop(farmer_data.get('soil_data', {}))
+            # Generate unique plan ID
+            plan_id = f"plan_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
             
-            # Get weather data for the location
+            # Crop recommendation and the 30-day forecast are independent
             location = farmer_data.get('location', 'Delhi')
-            weather_data = self.api_service.get_weather_data(location, 30)  # 30-day forecast
+            crop_future = self.crop_executor.submit(self.ml_service.predict_crop, farmer_data.get('soil_data', {}))
+            weather_future = self.executor.submit(self.api_service.get_weather_data, location, 30)
             
-            # Get market prices for recommended crops
-            market_data = {}
+            # Market prices only depend on the recommendation
+            crop_recommendation = self._result_by_deadline(
+                crop_future, deadline, self.ml_service.get_fallback_crop_prediction
+            )
+            best_crop = crop_recommendation.get('best_crop', 'wheat')
+            market_futures = {}
             for rec in crop_recommendation.get('recommendations', []):
                 crop_name = rec['crop']
-                market_data[crop_name] = self.api_service.get_market_prices(crop_name)
+                market_futures[crop_name] = self.executor.submit(self.api_service.get_market_prices, crop_name)
+            
+            weather_data = self._result_by_deadline(
+                weather_future, deadline, self.api_service.get_fallback_weather_data
+            )
+            market_data = {
+                crop_name: self._result_by_deadline(future, deadline, self.api_service.get_fallback_market_data)
+                for crop_name, future in market_futures.items()
+            }
             
             # Create comprehensive farming plan
             farming_plan = {
                 'plan_id': plan_id,
                 'created_at': datetime.now().isoformat(),
+                'data_fetched_at': time.time(),
                 'farmer_data': farmer_data,
                 'crop_recommendation': crop_recommendation,
                 'weather_forecast': weather_data,
                 'market_data': market_data,
-                'timeline': self._generate_farming_timeline(farmer_data, crop_recommendation),
+                # The AI timeline is generated in the background and replaces this
+                'timeline': self._get_default_timeline(best_crop),
+                'timeline_status': 'pending',
                 'current_phase': 'planning',
+                'progress': self._new_progress_state(),
+                'progress_tail': [],
                 'reminders': [],
                 'alerts': []
             }
             
-            # Store the plan
-            self.farming_plans[plan_id] = farming_plan
-            
             # Generate initial reminders and alerts
             self._generate_reminders_and_alerts(farming_plan)
             
+            # Store the plan
+            self.plan_store.put(farming_plan)
+            if self.scheduler is not None:
+                self.scheduler.touch(plan_id)
+            
+            self.timeline_executor.submit(self._run_timeline_job, plan_id, farmer_data, crop_recommendation)
+            
+            elapsed_ms = (time.monotonic() - started_at) * 1000
+            self.stats['plans_created'] += 1
+            self.stats['plan_creation_ms_total'] += elapsed_ms
+            self.stats['plan_creation_ms_last'] = elapsed_ms
+            
             return farming_plan
             
         except Exception as e:
             print(f"Error creating farming plan: {e}")
             return None
     
-    def _generate_farming_timeline(self, farmer_data, crop_recommendation):
-        """Generate detailed farming timeline based on crop and conditions"""
+    def _remaining(self, deadline):
+        """Seconds left before the plan deadline"""
+        return max(deadline - time.monotonic(), 0)
+    
+    def _result_by_deadline(self, future, deadline, fallback):
+        """Wait for a future until the plan deadline, then fall back"""
+        try:
+            return future.result(timeout=self._remaining(deadline))
+        except FutureTimeoutError:
+            self.stats['deadline_fallbacks'] += 1
+            print("Farming plan dependency missed the deadline, using fallback")
+            return fallback()
+    
+    def _run_timeline_job(self, plan_id, farmer_data, crop_recommendation):
+        """Background job: generate the AI timeline and swap it into the plan"""
+        started_at = time.monotonic()
+        timeline = None
+        try:
+            ai_timeline = self.api_service.get_gemini_response(
+                self._build_timeline_prompt(farmer_data, crop_recommendation)
+            )
+            timeline = self._extract_timeline(ai_timeline)
+        except Exception as e:
+            print(f"Error generating AI timeline: {e}")
+        
+        updated_at = datetime.now().isoformat()
+        
+        def apply_timeline(plan):
+            # Applied to the latest copy of the plan, so progress made meanwhile is kept
+            if timeline is not None:
+                previous_weeks = plan['timeline'].get('weeks', [])
+                plan['timeline'] = timeline
+                plan['current_phase'] = self._remap_phase(plan['current_phase'], previous_weeks, timeline)
+                plan['timeline_status'] = 'ready'
+            else:
+                # Keep the default timeline the plan was created with
+                plan['timeline_status'] = 'default'
+            plan['timeline_updated_at'] = updated_at
+        
+        plan = self.plan_store.update(plan_id, apply_timeline)
+        if plan is None:
+            return
+        self.stats['timelines_generated' if timeline is not None else 'timeline_fallbacks'] += 1
+        self.stats['timeline_job_ms_last'] = (time.monotonic() - started_at) * 1000
+        
+        self._generate_reminders_and_alerts(plan)
+        self._emit_plan_event(plan, 'timeline_ready', {
+            'timeline_status': plan['timeline_status'],
+            'timeline': plan['timeline']
+        })
+        self._notify_user(
+            plan,
+            title="Your farming timeline is ready",
+            message=(
+                f"A personalized timeline for plan {plan_id} has been generated."
+                if timeline is not None else
+                f"We could not personalize the timeline for plan {plan_id}; the standard timeline is in use."
+            ),
+            notification_type='timeline_ready'
+        )
+    
+    def _build_timeline_prompt(self, farmer_data, crop_recommendation):
+        """Build the farming timeline prompt"""
         best_crop = crop_recommendation.get('best_crop', 'wheat')
         location = farmer_data.get('location', 'Delhi')
         
-        # Get AI advice for timeline
-        ai_timeline_prompt = f"""
+        return f"""
         Create a detailed farming timeline for {best_crop} cultivation in {location}.
         Consider the following factors:
         - Soil conditions: {farmer_data.get('soil_data', {})}
@@ -77,21 +223,81 @@ class FarmingJourneyService:
         7. Harvest timing
         8. Post-harvest activities
         
-        Format as JSON with dates, activities, and important notes.
+        Format as JSON only, in this shape:
+        {{"weeks": [{{"week": 1, "phase": "Soil Preparation", "activities": ["Land plowing"], "duration": "1-2 weeks"}}]}}
         """
+    
+    def _remap_phase(self, phase, previous_weeks, timeline):
+        """Carry the current phase over to a new timeline whose phase names may differ"""
+        names = [week['phase'] for week in timeline['weeks']]
+        if phase == 'planning' or phase in names:
+            return phase
+        previous_names = [week.get('phase') for week in previous_weeks]
+        if phase in previous_names:
+            # Same position in the new timeline
+            return names[min(previous_names.index(phase), len(names) - 1)]
+        return 'planning'
+    
+    def _extract_timeline(self, ai_response):
+        """Extract a {'weeks': [...]} timeline from an AI response, or None if it isn't usable"""
+        if not ai_response:
+            return None
         
+        # Models often wrap JSON in markdown fences or surrounding prose
+        match = re.search(r'(\{.*\}|\[.*\])', ai_response, re.DOTALL)
+        if not match:
+            return None
         try:
-            ai_timeline = self.api_service.get_gemini_response(ai_timeline_prompt)
-            return self._parse_timeline_response(ai_timeline, best_crop)
-        except Exception as e:
-            print(f"Error generating AI timeline: {e}")
-            return self._get_default_timeline(best_crop)
+            data = json.loads(match.group(1))
+        except ValueError:
+            return None
+        
+        weeks = data.get('weeks') if isinstance(data, dict) else data
+        if not isinstance(weeks, list):
+            return None
+        
+        timeline = []
+        for i, item in enumerate(weeks):
+            if not isinstance(item, dict) or not item.get('phase'):
+                continue
+            activities = item.get('activities') or []
+            if isinstance(activities, str):
+                activities = [activities]
+            try:
+                week = int(item.get('week', i + 1))
+            except (TypeError, ValueError):
+                week = i + 1
+            timeline.append({
+                'week': week,
+                'phase': str(item['phase']),
+                'activities': [str(a) for a in activities],
+                'duration': str(item.get('duration', '1 week'))
+            })
+        
+        return {'weeks': timeline} if timeline else None
     
-    def _parse_timeline_response(self, ai_response, crop):
-        """Parse AI timeline response into structured format"""
-        # This would parse the AI response into structured timeline
-        # For now, return a default timeline
-        return self._get_default_timeline(crop)
+    def add_listener(self, callback):
+        """Register callback(plan_id, event_type, data) for plan change events"""
+        self._listeners.append(callback)
+    
+    def _emit_plan_event(self, plan, event_type, data):
+        """Tell listeners about a plan change (e.g. the AI timeline arriving)"""
+        for callback in self._listeners:
+            try:
+                callback(plan['plan_id'], event_type, data)
+            except Exception as e:
+                print(f"Plan event listener error: {e}")
+    
+    def _notify_user(self, plan, title, message, notification_type='general', priority='medium'):
+        """Store a Notification for the plan's owner, if the plan has one"""
+        user_id = plan['farmer_data'].get('user_id')
+        if not user_id or self.app is None:
+            return
+        try:
+            with self.app.app_context():
+                auth_service.create_notification(user_id, title, message, notification_type, priority)
+        except Exception as e:
+            print(f"Notification error: {e}")
     
     def _get_default_timeline(self, crop):
         """Get default farming timeline based on crop type"""
@@ -125,109 +331,238 @@ class FarmingJourneyService:
         return timelines.get(crop.lower(), timelines['wheat'])
     
     def _generate_reminders_and_alerts(self, farming_plan):
-        """Generate reminders and alerts based on farming plan"""
-        reminders = []
-        alerts = []
-        
-        # Weather-based alerts
-        weather = farming_plan.get('weather_forecast', {})
-        if weather.get('forecast'):
-            for day in weather['forecast'].get('forecastday', [])[:7]:  # Next 7 days
-                if day.get('day', {}).get('daily_chance_of_rain', 0) > 70:
-                    alerts.append({
-                        'type': 'rain_alert',
-                        'message': f"High chance of rain ({day['day']['daily_chance_of_rain']}%) on {day['date']}. Consider protecting your crops.",
-                        'date': day['date'],
-                        'priority': 'high'
-                    })
-        
-        # Timeline-based reminders
-        timeline = farming_plan.get('timeline', {})
-        current_phase = farming_plan.get('current_phase', 'planning')
-        
-        for week_data in timeline.get('weeks', []):
-            if week_data.get('phase') == current_phase:
-                for activity in week_data.get('activities', []):
-                    reminders.append({
-                        'type': 'activity_reminder',
-                        'message': f"Time to {activity.lower()}",
-                        'activity': activity,
-                        'phase': week_data.get('phase'),
-                        'priority': 'medium'
-                    })
-        
-        # Market-based alerts
-        market_data = farming_plan.get('market_data', {})
-        for crop, data in market_data.items():
-            if data and 'data' in data and data['data']:
-                price_change = data['data'][0].get('change_percent', 0)
-                if abs(price_change) > 5:  # Significant price change
-                    alerts.append({
-                        'type': 'market_alert',
-                        'message': f"{crop} prices changed by {price_change}%. Consider timing your harvest/sale.",
-                        'crop': crop,
-                        'change': price_change,
-                        'priority': 'medium'
-                    })
-        
-        farming_plan['reminders'] = reminders
-        farming_plan['alerts'] = alerts
+        """Refresh reminders and alerts, re-running only rules whose inputs changed"""
+        changed = self.reminder_engine.evaluate(farming_plan)
+        if changed:
+            self._emit_plan_event(farming_plan, 'reminders', self._active_reminders(farming_plan))
+        return changed
+    
+    def _active_reminders(self, plan):
+        """High-priority reminders and alerts, as shown on the dashboard"""
+        return {
+            'reminders': self.reminder_engine.query(plan, 'reminders', priority='high'),
+            'alerts': self.reminder_engine.query(plan, 'alerts', priority='high')
+        }
     
     def update_farming_progress(self, plan_id, progress_update):
         """Update farming progress and generate new recommendations"""
-        if plan_id not in self.farming_plans:
+        return self.apply_progress_events(plan_id, [progress_update])
+    
+    def apply_progress_events(self, plan_id, progress_updates):
+        """Append progress events to the plan's log and fold them into its progress state
+        
+        Returns a fixed-size summary rather than the plan, so responses don't
+        grow with the plan's history. Raises ValueError for a malformed event
+        before anything is stored.
+        """
+        for index, update in enumerate(progress_updates):
+            error = self._progress_event_error(update)
+            if error:
+                raise ValueError(f"event {index}: {error}" if len(progress_updates) > 1 else error)
+        
+        plan = self.plan_store.get(plan_id)
+        if plan is None:
+            return None
+        
+        # The log assigns seqs; the plan is only touched once the events are stored
+        legacy = plan.get('progress_updates') or []
+        now = datetime.now().isoformat()
+        events = [dict(update) for update in legacy]
+        events += [dict(update, timestamp=update.get('timestamp', now)) for update in progress_updates]
+        events = self.plan_store.append_progress(plan_id, events)
+        
+        def apply_progress(plan):
+            if 'progress' not in plan:
+                plan['progress'] = self._new_progress_state()
+                plan['progress_tail'] = []
+            plan.pop('progress_updates', None)
+            for event in events:
+                self._apply_progress_event(plan, event)
+            # Another worker may have folded later seqs first
+            plan['progress_tail'].sort(key=lambda event: event['seq'])
+            plan['last_updated'] = datetime.now().isoformat()
+            if len(plan['progress_tail']) > Config.PROGRESS_COMPACT_EVERY:
+                self._compact_progress(plan)
+        
+        plan = self.plan_store.update(plan_id, apply_progress)
+        if plan is None:
             return None
         
-        plan = self.farming_plans[plan_id]
-        plan['last_updated'] = datetime.now().isoformat()
-        plan['progress_updates'] = plan.get('progress_updates', [])
-        plan['progress_updates'].append(progress_update)
+        # Regenerate reminders and alerts once for the whole batch
+        self._generate_reminders_and_alerts(plan)
+        self.stats['progress_events'] += len(progress_updates)
+        
+        return self._progress_summary(plan)
+    
+    def get_progress_history(self, plan_id, after_seq=0, limit=100):
+        """Page through a plan's progress log, oldest first"""
+        return self.plan_store.progress_events(plan_id, after_seq, limit)
+    
+    def _progress_event_error(self, update):
+        """Why a progress update can't be logged, or None if it can"""
+        if not isinstance(update, dict):
+            return 'progress update must be an object'
+        for field in ('timestamp', 'activity'):
+            if update.get(field) is not None and not isinstance(update[field], str):
+                return f'{field} must be a string'
+        return None
+    
+    def _new_progress_state(self):
+        return {'event_count': 0, 'activities_logged': 0, 'phases_completed': [], 'compacted_through': 0}
+    
+    def _apply_progress_event(self, plan, event):
+        """Fold one stored log event into the plan state"""
+        progress = plan['progress']
+        progress['event_count'] = max(progress['event_count'], event['seq'])
+        
+        if event.get('activity'):
+            progress['activities_logged'] += 1
         
         # Update current phase based on progress
-        if progress_update.get('phase_completed'):
+        if event.get('phase_completed'):
             current_phase_index = self._get_phase_index(plan['current_phase'], plan['timeline'])
             if current_phase_index < len(plan['timeline']['weeks']) - 1:
+                progress['phases_completed'].append(plan['current_phase'])
                 plan['current_phase'] = plan['timeline']['weeks'][current_phase_index + 1]['phase']
         
-        # Regenerate reminders and alerts
-        self._generate_reminders_and_alerts(plan)
-        
-        return plan
+        if event.get('timestamp'):
+            progress['last_event_at'] = max(progress.get('last_event_at') or '', event['timestamp'])
+        plan['progress_tail'].append(event)
     
-    def get_farming_dashboard(self, plan_id):
-        """Get comprehensive farming dashboard data"""
-        if plan_id not in self.farming_plans:
-            return None
+    def _compact_progress(self, plan):
+        """Drop logged events from the plan, keeping only the most recent ones"""
+        tail = plan['progress_tail'][-Config.PROGRESS_RECENT_EVENTS:]
+        plan['progress_tail'] = tail
+        plan['progress']['compacted_through'] = tail[0]['seq'] - 1 if tail else plan['progress']['event_count']
+        self.stats['progress_compactions'] += 1
+    
+    def _progress_summary(self, plan):
+        """Bounded view of a plan's progress"""
+        return {
+            'plan_id': plan['plan_id'],
+            'current_phase': plan['current_phase'],
+            'next_activities': self._get_next_activities(plan),
+            'progress': plan['progress'],
+            'recent_updates': plan['progress_tail'][-Config.PROGRESS_RECENT_EVENTS:],
+            'last_updated': plan.get('last_updated')
+        }
+    
+    def get_plan_version(self, plan_id):
+        """Cheap change marker for a plan (e.g. for event stream resyncs); None if unknown"""
+        return self.plan_store.version(plan_id)
+    
+    def get_farming_dashboard(self, plan_id, fields=None, memo=None, touch=True):
+        """Get farming dashboard data, serving expensive sections from the precomputed snapshot
         
-        plan = self.farming_plans[plan_id]
+        touch=False reads without marking the plan active for the background scheduler.
+        """
+        if self.scheduler is None:
+            return self._build_dashboard(plan_id, fields, memo)
         
-        # Get current weather
-        location = plan['farmer_data'].get('location', 'Delhi')
-        current_weather = self.api_service.get_weather_data(location, 1)
+        if touch:
+            self.scheduler.touch(plan_id)
+        names = fields or list(self._dashboard_sections())
+        snapshot_names = [n for n in names if n in DashboardScheduler.SNAPSHOT_SECTIONS]
+        if not snapshot_names:
+            return self._build_dashboard(plan_id, names, memo)
         
-        # Get current market prices
-        best_crop = plan['crop_recommendation'].get('best_crop', 'wheat')
-        current_market = self.api_service.get_market_prices(best_crop)
+        snapshot = self.scheduler.get_snapshot(plan_id)
+        if snapshot is None:
+            dashboard_data = self._build_dashboard(plan_id, names, memo)
+            if dashboard_data is not None and len(snapshot_names) == len(DashboardScheduler.SNAPSHOT_SECTIONS):
+                self.scheduler.store_snapshot(plan_id, {n: dashboard_data[n] for n in snapshot_names})
+            return dashboard_data
+        
+        # Cheap plan-derived sections stay live; the rest come from the snapshot
+        sections, age = snapshot
+        live_names = [n for n in names if n not in DashboardScheduler.SNAPSHOT_SECTIONS]
+        dashboard_data = self._build_dashboard(plan_id, live_names, memo)
+        if dashboard_data is None:
+            return None
+        for name in names:
+            if name in sections:
+                dashboard_data[name] = sections[name]
+        dashboard_data['snapshot_age_seconds'] = round(age, 1)
+        return dashboard_data
+    
+    def _build_dashboard(self, plan_id, fields=None, memo=None):
+        """Compute dashboard sections inline"""
+        plan = self.plan_store.get(plan_id)
+        if plan is None:
+            return None
         
-        # Get price prediction
-        price_prediction = self.ml_service.predict_prices(best_crop, 30)
+        # Identical sub-computations run once per dashboard build
+        memo = memo or RequestMemo()
+        self._seed_memo_from_plan(plan, memo)
         
-        dashboard_data = {
-            'plan_id': plan_id,
-            'current_phase': plan['current_phase'],
-            'current_weather': current_weather,
-            'current_market': current_market,
-            'price_prediction': price_prediction,
-            'active_reminders': [r for r in plan['reminders'] if r.get('priority') == 'high'],
-            'active_alerts': [a for a in plan['alerts'] if a.get('priority') == 'high'],
-            'timeline': plan['timeline'],
-            'next_activities': self._get_next_activities(plan),
-            'crop_health_score': self._calculate_crop_health_score(plan),
-            'financial_summary': self._calculate_financial_summary(plan)
-        }
+        sections = self._dashboard_sections()
+        names = [name for name in fields if name in sections] if fields is not None else list(sections)
+        
+        dashboard_data = {'plan_id': plan_id}
+        for name in names:
+            dashboard_data[name] = sections[name](plan, memo)
         
+        self._record_memo_stats(memo)
         return dashboard_data
     
+    def _dashboard_sections(self):
+        """Named dashboard sections, each built lazily from (plan, memo)"""
+        return {
+            'current_phase': lambda plan, memo: plan['current_phase'],
+            'current_weather': self._dashboard_weather,
+            'current_market': self._dashboard_market,
+            'price_prediction': lambda plan, memo: self._predict_prices(memo, self._best_crop(plan), 30),
+            'active_reminders': lambda plan, memo: self.reminder_engine.query(plan, 'reminders', priority='high'),
+            'active_alerts': lambda plan, memo: self.reminder_engine.query(plan, 'alerts', priority='high'),
+            'timeline': lambda plan, memo: plan['timeline'],
+            'timeline_status': lambda plan, memo: plan.get('timeline_status', 'ready'),
+            'next_activities': lambda plan, memo: self._get_next_activities(plan),
+            'crop_health_score': lambda plan, memo: self._calculate_crop_health_score(plan),
+            'financial_summary': self._calculate_financial_summary
+        }
+    
+    def _best_crop(self, plan):
+        """Top recommended crop for the plan"""
+        return plan['crop_recommendation'].get('best_crop', 'wheat')
+    
+    def _dashboard_weather(self, plan, memo):
+        """Get current weather"""
+        location = plan['farmer_data'].get('location', 'Delhi')
+        return memo.get_or_compute(
+            ('weather', location, 1), lambda: self.api_service.get_weather_data(location, 1)
+        )
+    
+    def _dashboard_market(self, plan, memo):
+        """Get current market prices"""
+        best_crop = self._best_crop(plan)
+        return memo.get_or_compute(
+            ('market', best_crop), lambda: self.api_service.get_market_prices(best_crop)
+        )
+    
+    def _seed_memo_from_plan(self, plan, memo):
+        """Reuse market data the plan fetched recently instead of refetching it"""
+        fetched_at = plan.get('data_fetched_at')
+        if fetched_at is None or time.time() - fetched_at > Config.PLAN_DATA_REUSE_SECONDS:
+            return
+        for crop_name, market in plan.get('market_data', {}).items():
+            memo.seed(('market', crop_name), market)
+    
+    def _predict_prices(self, memo, crop_name, days_ahead):
+        """Price prediction, computed at most once per request"""
+        return memo.get_or_compute(
+            ('price_prediction', crop_name, days_ahead),
+            lambda: self.ml_service.predict_prices(crop_name, days_ahead)
+        )
+    
+    def _record_memo_stats(self, memo):
+        """Fold one request's memo counters into the service totals"""
+        memo_stats = memo.get_stats()
+        self.stats['dashboards_built'] += 1
+        self.stats['memo_computed'] += memo_stats['computed']
+        self.stats['memo_reused'] += memo_stats['reused']
+        self.stats['memo_seeded'] += memo_stats['seeded']
+        self.stats['last_dashboard_memo'] = memo_stats
+    
     def _get_phase_index(self, phase, timeline):
         """Get index of current phase in timeline"""
         for i, week_data in enumerate(timeline.get('weeks', [])):
@@ -255,13 +590,13 @@ class FarmingJourneyService:
             'factors': ['Weather favorable', 'No pest alerts', 'Growth on track']
         }
     
-    def _calculate_financial_summary(self, plan):
+    def _calculate_financial_summary(self, plan, memo=None):
         """Calculate financial summary"""
         budget = plan['farmer_data'].get('budget', 50000)
         best_crop = plan['crop_recommendation'].get('best_crop', 'wheat')
         
         # Get price prediction for ROI calculation
-        price_prediction = self.ml_service.predict_prices(best_crop, 30)
+        price_prediction = self._predict_prices(memo or RequestMemo(), best_crop, 30)
         
         estimated_yield = 2.5  # tons per acre (mock data)
         land_size = plan['farmer_data'].get('soil_data', {}).get('land_size', 2)
@@ -274,6 +609,16 @@ class FarmingJourneyService:
             'market_trend': price_prediction.get('trend_percentage', 0)
         }
 
+    def get_stats(self):
+        """Plan creation, dashboard, scheduler, reminder engine and plan store statistics"""
+        stats = dict(self.stats)
+        created = stats['plans_created']
+        stats['plan_creation_ms_avg'] = round(stats['plan_creation_ms_total'] / created, 1) if created else None
+        stats['plan_store'] = self.plan_store.get_stats()
+        stats['reminder_engine'] = self.reminder_engine.get_stats()
+        stats['dashboard_scheduler'] = self.scheduler.get_stats() if self.scheduler is not None else None
+        return stats
+
 # Initialize the service
 farming_journey_service = FarmingJourneyService()
 
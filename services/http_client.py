@@ -0,0 +1,141 @@
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class PooledHTTPClient:
+    """Keep-alive HTTP client with one connection pool per upstream host"""
+
+    def __init__(self, pool_maxsize=10, pool_block=True, pool_timeout=5, keep_alive=True,
+                 max_retries=2, backoff_factor=0.3,
+                 status_forcelist=(429, 500, 502, 503, 504), host_limits=None, host_retries=None):
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.pool_timeout = pool_timeout
+        self.keep_alive = keep_alive
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = tuple(status_forcelist)
+        self.host_limits = dict(host_limits or {})
+        self.host_retries = dict(host_retries or {})  # per-host max_retries, e.g. 0 where a breaker decides
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._requests_by_host = {}
+        self._slots = {}  # host -> semaphore capping concurrent requests when pool_block is on
+        self._pool_timeouts = {}
+
+    def get(self, url, **kwargs):
+        """Send a GET request through the pooled session for the url's host
+
+        With pool_block on, at most the host's limit of requests run at once;
+        others wait up to pool_timeout for a slot, then raise ConnectionError.
+        """
+        host = urlsplit(url).netloc
+        session = self._get_session(host)
+        with self._lock:
+            self._requests_by_host[host] = self._requests_by_host.get(host, 0) + 1
+        if not self.pool_block:
+            return session.get(url, **kwargs)
+
+        # requests doesn't pass a pool timeout to urllib3, so the wait is bounded here
+        slots = self._slots[host]
+        if not slots.acquire(timeout=self.pool_timeout):
+            with self._lock:
+                self._pool_timeouts[host] = self._pool_timeouts.get(host, 0) + 1
+            raise requests.exceptions.ConnectionError(f"No free connection to {host} within {self.pool_timeout}s")
+        try:
+            return session.get(url, **kwargs)
+        finally:
+            slots.release()
+
+    def _get_session(self, host):
+        """Get or lazily create the session that owns the pool for a host"""
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._create_session(host)
+                self._slots[host] = threading.BoundedSemaphore(self.host_limits.get(host, self.pool_maxsize))
+                self._sessions[host] = session
+            return session
+
+    def _create_session(self, host):
+        """Build a session whose adapter enforces the host's pool limits"""
+        max_retries = self.host_retries.get(host, self.max_retries)
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.status_forcelist,
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False
+        )
+        pool_maxsize = self.host_limits.get(host, self.pool_maxsize)
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+            pool_block=self.pool_block
+        )
+
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['Connection'] = 'keep-alive' if self.keep_alive else 'close'
+        return session
+
+    def get_stats(self):
+        """Connection reuse counters per upstream host"""
+        with self._lock:
+            sessions = dict(self._sessions)
+            requests_by_host = dict(self._requests_by_host)
+            pool_timeouts = dict(self._pool_timeouts)
+
+        hosts = {}
+        for host, session in sessions.items():
+            new_connections = 0
+            pooled_requests = 0
+            for adapter in session.adapters.values():
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    new_connections += pool.num_connections
+                    pooled_requests += pool.num_requests
+                # http:// and https:// share a single adapter
+                break
+
+            hosts[host] = {
+                'requests': requests_by_host.get(host, 0),
+                'new_connections': new_connections,
+                'reused_connections': max(pooled_requests - new_connections, 0),
+                'pool_maxsize': self.host_limits.get(host, self.pool_maxsize),
+                'max_retries': self.host_retries.get(host, self.max_retries),
+                'pool_timeouts': pool_timeouts.get(host, 0)
+            }
+
+        return {
+            'keep_alive': self.keep_alive,
+            'pool_block': self.pool_block,
+            'max_retries': self.max_retries,
+            'backoff_factor': self.backoff_factor,
+            'hosts': hosts
+        }
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
@@ -1,231 +1,313 @@
 import pandas as pd
 import numpy as np
 import joblib
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.preprocessing import LabelEncoder
 from datetime import datetime, timedelta
+import copy
 import json
 import os
+import time
+from config import Config
+from cache import TTLCache
+from tree_engine import CompiledForest
+from process_memory import current_rss_kb, process_memory, mapped_file_memory
+from model_bundle import (BUNDLE_FILENAME, CROP_FEATURES, ModelBundleError, decode_bundle, encode_bundle,
+                          load_bundle, write_bundle)
+
+# Form defaults for the crop recommender features
+CROP_FORM_DEFAULTS = {
+    'soil_type': 'loamy',
+    'soil_ph': 6.5,
+    'rainfall': 800,
+    'temperature': 28,
+    'humidity': 70,
+    'nitrogen': 50,
+    'phosphorus': 30,
+    'potassium': 40,
+    'budget': 50000,
+    'land_size': 2
+}
+
+# Training column order comes from the bundle schema; a feature without a default fails at import
+CROP_FEATURE_DEFAULTS = {name: CROP_FORM_DEFAULTS[name] for name in CROP_FEATURES}
+
+# Quantization steps for the crop memo (when CROP_MEMO_QUANTIZE is on), matching form precision
+CROP_FEATURE_STEPS = {
+    'soil_ph': 0.1,
+    'rainfall': 10,
+    'temperature': 0.5,
+    'humidity': 1,
+    'nitrogen': 1,
+    'phosphorus': 1,
+    'potassium': 1,
+    'budget': 1000,
+    'land_size': 0.1
+}
+
+# Crop-specific adjustments applied to the forecaster's base price
+CROP_PRICE_MULTIPLIERS = {
+    'wheat': 1.0,
+    'rice': 1.46,
+    'maize': 0.75,
+    'cotton': 2.5,
+    'sugarcane': 1.33
+}
 
 class MLService:
+    PRICE_TABLE_YEARS = 5  # years of (year, month) prices precomputed at load
+    ENGINE_MAX_BATCH = 256  # larger batches are faster through sklearn's Cython trees
+    
     def __init__(self):
-        self.models_dir = "models"
+        self.models_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
         self.crop_recommender = None
         self.price_forecaster = None
         self.label_encoders = {}
+        self.label_codes = {}  # feature column index -> {label: code}, built once at load
+        self.bundle_manifest = None
+        self.warmup_ms = None
+        self.crop_engine = None  # CompiledForest, when it matches sklearn
+        self.crop_memo = TTLCache(maxsize=Config.CROP_MEMO_SIZE, ttl=None, name='crop_memo')
+        self.price_tables = None  # (base_year, {crop: [year, month] prices})
         
-        # Load or create models
-        self._load_or_create_models()
-    
-    def _load_or_create_models(self):
-        """Load existing models or create new ones"""
+        # Load the model bundle; a missing or invalid bundle raises ModelBundleError
+        rss_before = current_rss_kb()
+        self._load_models()
+        self._compile_crop_engine()
         try:
-            # Try to load existing models
-            self.crop_recommender = joblib.load(f"{self.models_dir}/crop_recommender.pkl")
-            self.price_forecaster = joblib.load(f"{self.models_dir}/price_forecaster.pkl")
-            print("Models loaded successfully")
-        except:
-            print("Creating new models...")
-            self._create_crop_recommender()
-            self._create_price_forecaster()
-    
-    def _create_crop_recommender(self):
-        """Create crop recommendation model"""
-        # Sample agricultural data for training
-        np.random.seed(42)
-        n_samples = 1000
+            self.price_tables = self._build_price_tables(datetime.now().year + self.PRICE_TABLE_YEARS - 1)
+        except Exception as e:
+            print(f"Price table error: {e}")
+        self._warm_up()
+        rss_after = current_rss_kb()
         
-        data = {
-            'soil_type': np.random.choice(['clay', 'sandy', 'loamy', 'silty'], n_samples),
-            'soil_ph': np.random.normal(6.5, 1.0, n_samples),
-            'rainfall': np.random.normal(800, 200, n_samples),
-            'temperature': np.random.normal(28, 5, n_samples),
-            'humidity': np.random.normal(70, 10, n_samples),
-            'nitrogen': np.random.normal(50, 15, n_samples),
-            'phosphorus': np.random.normal(30, 10, n_samples),
-            'potassium': np.random.normal(40, 12, n_samples),
-            'budget': np.random.normal(50000, 15000, n_samples),
-            'land_size': np.random.normal(2, 1, n_samples)
+        # With gunicorn's preload_app this runs once in the master and workers inherit it
+        self.loaded_in_pid = os.getpid()
+        self.model_load_rss_kb = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+    
+    def _load_models(self):
+        """Load and validate the model bundle, building it from legacy pickles if absent"""
+        bundle_path = os.path.join(self.models_dir, BUNDLE_FILENAME)
+        if os.path.exists(bundle_path):
+            self.bundle_manifest, models = load_bundle(bundle_path, CROP_FEATURE_DEFAULTS)
+        else:
+            self.bundle_manifest, models = self._build_bundle(bundle_path)
+        self.crop_recommender = models['crop_recommender']
+        self.price_forecaster = models['price_forecaster']
+        self.label_encoders = models['label_encoders']
+        # Looked up by name, so the encoded columns follow CROP_FEATURES wherever they sit
+        self.label_codes = {
+            CROP_FEATURES.index(name): {label: code for code, label in enumerate(encoder.classes_)}
+            for name, encoder in self.label_encoders.items() if name in CROP_FEATURES
         }
+        print(f"Model bundle v{self.bundle_manifest['version']} loaded ({self.bundle_manifest['checksum'][:12]})")
+    
+    def _build_bundle(self, bundle_path):
+        """Build the bundle from the legacy per-model pickles and load it; the web app never trains"""
+        legacy = {name: os.path.join(self.models_dir, f"{name}.pkl")
+                  for name in ('crop_recommender', 'price_forecaster', 'label_encoders')}
+        if not all(os.path.exists(path) for path in legacy.values()):
+            raise ModelBundleError(f"No model bundle at {bundle_path}; run python train_models.py to train one")
         
-        # Define crop recommendations based on conditions
-        crops = []
-        for i in range(n_samples):
-            soil = data['soil_type'][i]
-            ph = data['soil_ph'][i]
-            temp = data['temperature'][i]
-            rainfall = data['rainfall'][i]
-            budget = data['budget'][i]
-            
-            if soil == 'loamy' and 6 <= ph <= 7.5 and temp > 25:
-                if rainfall > 700 and budget > 40000:
-                    crops.append('rice')
-                elif rainfall < 600 and budget > 30000:
-                    crops.append('wheat')
-                else:
-                    crops.append('maize')
-            elif soil == 'sandy' and temp > 30:
-                crops.append('cotton')
-            elif soil == 'clay' and ph > 7:
-                crops.append('sugarcane')
-            else:
-                crops.append('vegetables')
-        
-        data['crop'] = crops
-        
-        # Prepare features
-        df = pd.DataFrame(data)
-        X = df.drop('crop', axis=1)
-        y = df['crop']
-        
-        # Encode categorical variables
-        le_soil = LabelEncoder()
-        X['soil_type'] = le_soil.fit_transform(X['soil_type'])
-        self.label_encoders['soil_type'] = le_soil
+        print("Building model bundle from legacy pickles...")
+        try:
+            models = {name: joblib.load(path) for name, path in legacy.items()}
+        except Exception as e:
+            raise ModelBundleError(f"Cannot load legacy model pickles: {e}") from e
         
-        # Train model
-        self.crop_recommender = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.crop_recommender.fit(X, y)
+        _, data = encode_bundle(crop_features=CROP_FEATURE_DEFAULTS, **models)
+        try:
+            write_bundle(bundle_path, data)
+        except OSError as e:
+            # e.g. a read-only deploy: validate and use the bundle without saving it
+            print(f"Model bundle not saved, keeping it in process memory: {e}")
+            return decode_bundle(data, CROP_FEATURE_DEFAULTS, 'built from legacy pickles')
+        return load_bundle(bundle_path, CROP_FEATURE_DEFAULTS)
+    
+    def predict_crop(self, soil_data):
+        """Predict best crop based on soil and weather conditions"""
+        try:
+            return self._predict_crop_rows([soil_data], [self._encode_crop_features(soil_data)])[0]
+        except Exception as e:
+            print(f"Prediction error: {e}")
+            return self.get_fallback_crop_prediction()
+    
+    def predict_crop_batch(self, soil_profiles):
+        """Predict crops for many soil profiles with a single forest pass"""
+        results = [None] * len(soil_profiles)
+        try:
+            profiles, rows, positions = [], [], []
+            for i, soil_data in enumerate(soil_profiles):
+                try:
+                    rows.append(self._encode_crop_features(soil_data))
+                    profiles.append(soil_data)
+                    positions.append(i)
+                except (ValueError, TypeError):
+                    continue  # unknown soil type or bad value: fallback below, as predict_crop does
+            
+            for i, result in zip(positions, self._predict_crop_rows(profiles, rows)):
+                results[i] = result
+        except Exception as e:
+            print(f"Batch prediction error: {e}")
         
-        # Save model
-        os.makedirs(self.models_dir, exist_ok=True)
-        joblib.dump(self.crop_recommender, f"{self.models_dir}/crop_recommender.pkl")
-        joblib.dump(self.label_encoders, f"{self.models_dir}/label_encoders.pkl")
+        return [result if result is not None else self.get_fallback_crop_prediction() for result in results]
     
-    def _create_price_forecaster(self):
-        """Create price forecasting model"""
-        # Sample price data
-        np.random.seed(42)
-        dates = pd.date_range(start='2020-01-01', end='2024-01-01', freq='D')
+    def _predict_crop_rows(self, soil_profiles, rows):
+        """Recommendations for encoded rows, scoring only profiles the memo hasn't seen"""
+        keys = [self._crop_memo_key(row) for row in rows]
+        results = {}
+        pending = {}  # key -> (profile, row); duplicates in a batch are scored once
+        for key, soil_data, row in zip(keys, soil_profiles, rows):
+            if key in results or key in pending:
+                continue
+            cached = self.crop_memo.get(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                pending[key] = (soil_data, row)
         
-        crops = ['wheat', 'rice', 'maize', 'cotton', 'sugarcane']
-        price_data = []
+        if pending:
+            pending_profiles = [soil_data for soil_data, _ in pending.values()]
+            probabilities = self._crop_probabilities([row for _, row in pending.values()])
+            # Yield/investment estimates only depend on the crop, so whole results are reusable
+            for key, result in zip(pending, self._build_crop_results(pending_profiles, probabilities)):
+                self.crop_memo.set(key, result)
+                results[key] = result
         
-        for crop in crops:
-            base_price = {'wheat': 2400, 'rice': 3500, 'maize': 1800, 'cotton': 6000, 'sugarcane': 3200}[crop]
-            
-            for date in dates:
-                # Seasonal variation
-                month = date.month
-                seasonal_factor = 1 + 0.2 * np.sin(2 * np.pi * month / 12)
-                
-                # Random variation
-                random_factor = np.random.normal(1, 0.1)
-                
-                price = base_price * seasonal_factor * random_factor
-                
-                price_data.append({
-                    'date': date,
-                    'crop': crop,
-                    'price': price,
-                    'month': month,
-                    'year': date.year
-                })
+        return [copy.deepcopy(results[key]) for key in keys]
+    
+    def _build_crop_results(self, soil_profiles, probabilities):
+        """Top-3 recommendations per row of class probabilities"""
+        classes = self.crop_recommender.classes_
         
-        df = pd.DataFrame(price_data)
+        # Top 3 per row, highest first (argsort order decides ties)
+        best_indices = np.argmax(probabilities, axis=1)
+        top_indices = np.argsort(probabilities, axis=1)[:, :-4:-1]
+        top_probabilities = np.take_along_axis(probabilities, top_indices, axis=1)
         
-        # Prepare features for forecasting
-        features = ['month', 'year']
-        X = df[features]
-        y = df['price']
+        results = []
+        for row_index, soil_data in enumerate(soil_profiles):
+            recommendations = [
+                {
+                    'crop': str(classes[idx]),
+                    'confidence': float(confidence),
+                    'estimated_yield': self._estimate_yield(classes[idx], soil_data),
+                    'required_investment': self._estimate_investment(classes[idx], soil_data)
+                }
+                for idx, confidence in zip(top_indices[row_index], top_probabilities[row_index])
+            ]
+            results.append({
+                'recommendations': recommendations,
+                'best_crop': str(classes[best_indices[row_index]]),
+                'confidence': float(probabilities[row_index, best_indices[row_index]])
+            })
+        return results
+    
+    def _encode_crop_features(self, soil_data):
+        """Raw feature row in training column order, with label-encoded columns (soil type) encoded"""
+        row = [soil_data.get(name, default) for name, default in CROP_FEATURE_DEFAULTS.items()]
+        for i, codes in self.label_codes.items():
+            if row[i] not in codes:
+                raise ValueError(f"y contains previously unseen labels: {row[i]!r}")
+            row[i] = codes[row[i]]
         
-        # Train model
-        self.price_forecaster = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.price_forecaster.fit(X, y)
+        # Optionally snap inputs to form precision so near-identical profiles share a result
+        if Config.CROP_MEMO_QUANTIZE:
+            for i, name in enumerate(CROP_FEATURE_DEFAULTS):
+                step = CROP_FEATURE_STEPS.get(name)
+                if step:
+                    row[i] = round(float(row[i]) / step) * step
         
-        # Save model
-        joblib.dump(self.price_forecaster, f"{self.models_dir}/price_forecaster.pkl")
+        # The forest compares float32 values, so this is exactly what it sees
+        return np.asarray(row, dtype=np.float32)
     
-    def predict_crop(self, soil_data):
-        """Predict best crop based on soil and weather conditions"""
+    def _crop_memo_key(self, row):
+        """Equal keys always score the same, since the key is the float32 row itself
+
+        NaN never equals itself, so missing values are keyed as None.
+        """
+        return tuple(None if value != value else value for value in row.tolist())
+    
+    def _crop_probabilities(self, rows):
+        """Class probabilities for encoded rows; small batches skip pandas and sklearn"""
+        rows = np.vstack(rows)
+        # sklearn routes missing values by learned rules the engine doesn't model
+        if self.crop_engine is not None and len(rows) <= self.ENGINE_MAX_BATCH and not np.isnan(rows).any():
+            return self.crop_engine.predict_proba(rows)
+        return self.crop_recommender.predict_proba(pd.DataFrame(rows, columns=list(CROP_FEATURE_DEFAULTS)))
+    
+    def _compile_crop_engine(self):
+        """Load the flattened crop recommender memory-mapped, rebuilding it when the bundle changes"""
         try:
-            # Prepare input data
-            input_data = pd.DataFrame([{
-                'soil_type': soil_data.get('soil_type', 'loamy'),
-                'soil_ph': soil_data.get('soil_ph', 6.5),
-                'rainfall': soil_data.get('rainfall', 800),
-                'temperature': soil_data.get('temperature', 28),
-                'humidity': soil_data.get('humidity', 70),
-                'nitrogen': soil_data.get('nitrogen', 50),
-                'phosphorus': soil_data.get('phosphorus', 30),
-                'potassium': soil_data.get('potassium', 40),
-                'budget': soil_data.get('budget', 50000),
-                'land_size': soil_data.get('land_size', 2)
-            }])
-            
-            # Encode categorical variables
-            input_data['soil_type'] = self.label_encoders['soil_type'].transform(input_data['soil_type'])
-            
-            # Make prediction
-            prediction = self.crop_recommender.predict(input_data)[0]
-            probabilities = self.crop_recommender.predict_proba(input_data)[0]
-            classes = self.crop_recommender.classes_
+            engine_path = os.path.join(self.models_dir, 'crop_engine.joblib')
+            source_digest = self.bundle_manifest['checksum']
             
-            # Get top 3 recommendations
-            top_indices = np.argsort(probabilities)[-3:][::-1]
-            recommendations = []
-            
-            for idx in top_indices:
-                recommendations.append({
-                    'crop': classes[idx],
-                    'confidence': float(probabilities[idx]),
-                    'estimated_yield': self._estimate_yield(classes[idx], soil_data),
-                    'required_investment': self._estimate_investment(classes[idx], soil_data)
-                })
-            
-            return {
-                'recommendations': recommendations,
-                'best_crop': prediction,
-                'confidence': float(max(probabilities))
-            }
+            engine = None
+            if os.path.exists(engine_path):
+                engine, digest = CompiledForest.load(engine_path)
+                if digest != source_digest:
+                    engine = None
+            if engine is None:
+                engine = CompiledForest.from_sklearn(self.crop_recommender)
+                try:
+                    engine.save(engine_path, source_digest)
+                    engine, _ = CompiledForest.load(engine_path)
+                except OSError as e:
+                    print(f"Crop engine not saved, keeping it in process memory: {e}")
             
+            if engine.matches(self.crop_recommender):
+                self.crop_engine = engine
+            else:
+                print("Compiled crop engine disagrees with sklearn, using sklearn")
         except Exception as e:
-            print(f"Prediction error: {e}")
-            return {
-                'recommendations': [
-                    {'crop': 'wheat', 'confidence': 0.8, 'estimated_yield': '2-3 tons/acre', 'required_investment': '₹40,000-50,000'},
-                    {'crop': 'rice', 'confidence': 0.7, 'estimated_yield': '3-4 tons/acre', 'required_investment': '₹45,000-60,000'},
-                    {'crop': 'maize', 'confidence': 0.6, 'estimated_yield': '2-3 tons/acre', 'required_investment': '₹35,000-45,000'}
-                ],
-                'best_crop': 'wheat',
-                'confidence': 0.8
-            }
+            print(f"Crop engine error: {e}")
+    
+    def _warm_up(self):
+        """Run every inference path once so the first request doesn't pay lazy-init costs"""
+        started_at = time.perf_counter()
+        row = self._encode_crop_features(CROP_FEATURE_DEFAULTS)
+        self._predict_crop_rows([CROP_FEATURE_DEFAULTS], [row])
+        # Large batches and NaN rows go through sklearn
+        self.crop_recommender.predict_proba(pd.DataFrame([row], columns=list(CROP_FEATURE_DEFAULTS)))
+        self.predict_prices('wheat', 30)
+        self.warmup_ms = round((time.perf_counter() - started_at) * 1000, 1)
+    
+    def get_fallback_crop_prediction(self):
+        """Default recommendation when the model can't score a profile"""
+        return {
+            'recommendations': [
+                {'crop': 'wheat', 'confidence': 0.8, 'estimated_yield': '2-3 tons/acre', 'required_investment': '₹40,000-50,000'},
+                {'crop': 'rice', 'confidence': 0.7, 'estimated_yield': '3-4 tons/acre', 'required_investment': '₹45,000-60,000'},
+                {'crop': 'maize', 'confidence': 0.6, 'estimated_yield': '2-3 tons/acre', 'required_investment': '₹35,000-45,000'}
+            ],
+            'best_crop': 'wheat',
+            'confidence': 0.8
+        }
     
     def predict_prices(self, crop_name, days_ahead=30):
         """Predict crop prices for next N days"""
         try:
-            future_dates = pd.date_range(start=datetime.now(), periods=days_ahead, freq='D')
-            predictions = []
+            # Forecast = lookup of (year, month) in the precomputed table
+            days = np.datetime64(datetime.now().date(), 'D') + np.arange(max(int(days_ahead), 0))
+            years = days.astype('datetime64[Y]').astype(int) + 1970
+            months = days.astype('datetime64[M]').astype(int) % 12 + 1
             
-            for date in future_dates:
-                features = pd.DataFrame([{
-                    'month': date.month,
-                    'year': date.year
-                }])
-                
-                price = self.price_forecaster.predict(features)[0]
-                
-                # Add crop-specific adjustments
-                crop_multipliers = {
-                    'wheat': 1.0,
-                    'rice': 1.46,
-                    'maize': 0.75,
-                    'cotton': 2.5,
-                    'sugarcane': 1.33
-                }
-                
-                adjusted_price = price * crop_multipliers.get(crop_name.lower(), 1.0)
-                
-                predictions.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'price': round(adjusted_price, 2),
-                    'trend': 'increasing' if len(predictions) > 0 and adjusted_price > predictions[-1]['price'] else 'decreasing'
-                })
+            base_year, tables = self._get_price_tables(int(years.max()) if len(days) else 0)
+            table = tables.get(crop_name.lower(), tables[None])
+            adjusted_prices = table[years - base_year, months - 1]
+            prices = np.round(adjusted_prices, 2)
+            
+            # A day is "increasing" if it beats the previous day's rounded price
+            increasing = np.zeros(len(prices), dtype=bool)
+            increasing[1:] = adjusted_prices[1:] > prices[:-1]
+            
+            predictions = [
+                {'date': date, 'price': price, 'trend': 'increasing' if up else 'decreasing'}
+                for date, price, up in zip(np.datetime_as_string(days).tolist(), prices.tolist(), increasing.tolist())
+            ]
             
             # Calculate overall trend
             if len(predictions) > 1:
-                start_price = predictions[0]['price']
-                end_price = predictions[-1]['price']
+                start_price = prices[0]
+                end_price = prices[-1]
                 trend_percentage = ((end_price - start_price) / start_price) * 100
             else:
                 trend_percentage = 0
@@ -234,7 +316,7 @@ class MLService:
                 'predictions': predictions,
                 'current_price': predictions[0]['price'] if predictions else 0,
                 'future_price': predictions[-1]['price'] if predictions else 0,
-                'trend_percentage': round(trend_percentage, 2),
+                'trend_percentage': float(round(trend_percentage, 2)),
                 'recommendation': self._get_selling_recommendation(trend_percentage)
             }
             
@@ -248,6 +330,32 @@ class MLService:
                 'recommendation': 'Prices are rising slightly. Consider waiting a bit longer.'
             }
     
+    def _get_price_tables(self, last_year):
+        """Per-crop (year, month) price tables, extended if last_year is past the end"""
+        price_tables = self.price_tables
+        if price_tables is None or last_year >= price_tables[0] + price_tables[1][None].shape[0]:
+            price_tables = self._build_price_tables(max(last_year, datetime.now().year + self.PRICE_TABLE_YEARS - 1))
+            self.price_tables = price_tables
+        return price_tables
+    
+    def _build_price_tables(self, last_year):
+        """Evaluate the forecaster once for every (year, month) and apply crop multipliers"""
+        base_year = datetime.now().year
+        years = np.arange(base_year, last_year + 1)
+        grid = pd.DataFrame({
+            'month': np.tile(np.arange(1, 13), len(years)),
+            'year': np.repeat(years, 12)
+        })
+        base_table = self.price_forecaster.predict(grid).reshape(len(years), 12)
+        
+        crops = list(CROP_PRICE_MULTIPLIERS)
+        multipliers = np.array([CROP_PRICE_MULTIPLIERS[crop] for crop in crops])
+        crop_tables = base_table[np.newaxis, :, :] * multipliers[:, np.newaxis, np.newaxis]
+        
+        tables = dict(zip(crops, crop_tables))
+        tables[None] = base_table * 1.0  # crops without a multiplier
+        return base_year, tables
+    
     def _estimate_yield(self, crop, soil_data):
         """Estimate crop yield based on conditions"""
         base_yields = {
@@ -272,6 +380,32 @@ class MLService:
         }
         return base_investments.get(crop, '₹40,000-50,000')
     
+    def get_stats(self):
+        """Crop memo, inference engine and model memory statistics"""
+        return {
+            'crop_memo': self.crop_memo.get_stats(),
+            'crop_engine': self.crop_engine is not None,
+            'crop_memo_quantize': Config.CROP_MEMO_QUANTIZE,
+            'model_bundle': {
+                'version': self.bundle_manifest['version'],
+                'checksum': self.bundle_manifest['checksum'],
+                'created_at': self.bundle_manifest['created_at'],
+                'sklearn_version': self.bundle_manifest['sklearn_version']
+            },
+            'warmup_ms': self.warmup_ms,
+            'memory': self.get_memory_report()
+        }
+    
+    def get_memory_report(self):
+        """This worker's memory, and how much of it the models account for (KiB)"""
+        return {
+            'pid': os.getpid(),
+            'models_preloaded': self.loaded_in_pid != os.getpid(),
+            'model_load_rss_kb': self.model_load_rss_kb,
+            'mapped_model_files': mapped_file_memory(self.models_dir),
+            'process': process_memory()
+        }
+    
     def _get_selling_recommendation(self, trend_percentage):
         """Get selling recommendation based on price trend"""
         if trend_percentage > 5:
@@ -0,0 +1,134 @@
+import hashlib
+import io
+import json
+import os
+from datetime import datetime
+
+import joblib
+import sklearn
+
+BUNDLE_FORMAT = 'agriconnect-model-bundle'
+BUNDLE_VERSION = 1
+BUNDLE_FILENAME = 'model_bundle.joblib'
+CROP_FEATURES = ['soil_type', 'soil_ph', 'rainfall', 'temperature', 'humidity',
+                 'nitrogen', 'phosphorus', 'potassium', 'budget', 'land_size']
+PRICE_FEATURES = ['month', 'year']
+
+
+class ModelBundleError(Exception):
+    """The model bundle is missing, corrupt or doesn't match what the code expects"""
+
+
+def save_bundle(path, crop_recommender, price_forecaster, label_encoders, crop_features):
+    """Write models, encoders and schema as one checksummed file (atomically); returns the manifest"""
+    manifest, data = encode_bundle(crop_recommender, price_forecaster, label_encoders, crop_features)
+    write_bundle(path, data)
+    return manifest
+
+
+def encode_bundle(crop_recommender, price_forecaster, label_encoders, crop_features):
+    """Serialize a bundle; returns (manifest, bytes)
+
+    Layout: a single JSON manifest line (format, version, schema, sha256 of
+    the payload), then the joblib payload. ``head -1`` shows the manifest.
+    """
+    payload = io.BytesIO()
+    joblib.dump({
+        'crop_recommender': crop_recommender,
+        'price_forecaster': price_forecaster,
+        'label_encoders': label_encoders
+    }, payload)
+    payload = payload.getvalue()
+
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'version': BUNDLE_VERSION,
+        'created_at': datetime.utcnow().isoformat(),
+        'sklearn_version': sklearn.__version__,
+        'schema': {
+            'crop_features': list(crop_features),
+            'crop_classes': [str(c) for c in crop_recommender.classes_],
+            'soil_types': [str(s) for s in label_encoders['soil_type'].classes_],
+            'price_features': PRICE_FEATURES
+        },
+        'checksum': hashlib.sha256(payload).hexdigest()
+    }
+    return manifest, json.dumps(manifest).encode('utf-8') + b'\n' + payload
+
+
+def write_bundle(path, data):
+    """Atomically write encoded bundle bytes; raises OSError (e.g. on a read-only deploy)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_bundle(path, crop_features):
+    """Load and validate a bundle; returns (manifest, models dict) or raises ModelBundleError"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        raise ModelBundleError(f"Cannot read model bundle {path}: {e}") from e
+    return decode_bundle(data, crop_features, path)
+
+
+def decode_bundle(data, crop_features, source='model bundle'):
+    """Validate encoded bundle bytes; returns (manifest, models dict) or raises ModelBundleError"""
+    line, _, payload = data.partition(b'\n')
+    manifest = _parse_manifest(line, source)
+
+    if hashlib.sha256(payload).hexdigest() != manifest.get('checksum'):
+        raise ModelBundleError(f"Model bundle {source} failed its checksum; re-run python train_models.py")
+
+    try:
+        models = joblib.load(io.BytesIO(payload))
+    except Exception as e:
+        raise ModelBundleError(f"Cannot unpickle model bundle {source}: {e}") from e
+
+    _validate(manifest, models, crop_features)
+    return manifest, models
+
+
+def _parse_manifest(line, path):
+    try:
+        manifest = json.loads(line)
+    except ValueError as e:
+        raise ModelBundleError(f"{path} is not a model bundle") from e
+    if not isinstance(manifest, dict) or manifest.get('format') != BUNDLE_FORMAT:
+        raise ModelBundleError(f"{path} is not a model bundle")
+    if manifest.get('version') != BUNDLE_VERSION:
+        raise ModelBundleError(
+            f"Model bundle version {manifest.get('version')} is not supported (expected {BUNDLE_VERSION})"
+        )
+    return manifest
+
+
+def _validate(manifest, models, crop_features):
+    """Check the bundle's schema against the models inside it and the code loading it"""
+    schema = manifest.get('schema', {})
+    crop_recommender = models.get('crop_recommender')
+    price_forecaster = models.get('price_forecaster')
+    label_encoders = models.get('label_encoders') or {}
+
+    if crop_recommender is None or price_forecaster is None:
+        raise ModelBundleError("Model bundle is missing a model")
+    if 'soil_type' not in label_encoders:
+        raise ModelBundleError("Model bundle is missing the soil_type encoder")
+    if schema.get('crop_features') != list(crop_features):
+        raise ModelBundleError(
+            f"Crop features {schema.get('crop_features')} don't match the service's {list(crop_features)}"
+        )
+
+    trained_features = getattr(crop_recommender, 'feature_names_in_', None)
+    if trained_features is not None and list(trained_features) != list(crop_features):
+        raise ModelBundleError(f"Crop recommender was trained on {list(trained_features)}")
+    if getattr(crop_recommender, 'n_features_in_', len(crop_features)) != len(crop_features):
+        raise ModelBundleError("Crop recommender expects a different number of features")
+    if [str(c) for c in crop_recommender.classes_] != schema.get('crop_classes'):
+        raise ModelBundleError("Crop classes don't match the bundle schema")
+    if [str(s) for s in label_encoders['soil_type'].classes_] != schema.get('soil_types'):
+        raise ModelBundleError("Soil types don't match the bundle schema")
+    if getattr(price_forecaster, 'n_features_in_', len(PRICE_FEATURES)) != len(PRICE_FEATURES):
+        raise ModelBundleError("Price forecaster expects a different number of features")
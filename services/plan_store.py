@@ -0,0 +1,432 @@
+import atexit
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, FarmingPlanDocument, PlanSnapshot, ProgressEvent
+from cache import TTLCache
+from snapshot_store import SNAPSHOT_REF_KEY, snapshot_store
+
+# {"$snapshot": "<sha256>"} references inside stored plan payloads
+SNAPSHOT_REF_PATTERN = re.compile(re.escape(json.dumps(SNAPSHOT_REF_KEY)) + r'\s*:\s*"([0-9a-f]{64})"')
+
+
+class MemoryPlanStore:
+    """Process-local plan store (single worker, lost on restart)"""
+
+    def __init__(self):
+        self._plans = {}
+        self._progress = {}  # plan_id -> append-only list of progress events
+        self._versions = {}  # plan_id -> number of writes
+        self._lock = threading.Lock()
+
+    def get(self, plan_id):
+        return self._plans.get(plan_id)
+
+    def put(self, plan):
+        """Store a new plan"""
+        self._plans[plan['plan_id']] = snapshot_store.share(plan)
+        self._versions[plan['plan_id']] = 1
+
+    def version(self, plan_id):
+        """Changes whenever the plan is written; None for unknown plans"""
+        return self._versions.get(plan_id)
+
+    def update(self, plan_id, mutate):
+        """Apply mutate to a copy of the stored plan and swap it in; returns the plan or None
+
+        Readers keep the plan they were handed, and a mutate that raises
+        leaves the stored plan untouched.
+        """
+        with self._lock:
+            plan = self._plans.get(plan_id)
+            if plan is None:
+                return None
+            plan = snapshot_store.copy_plan(plan)
+            mutate(plan)
+            self._plans[plan_id] = snapshot_store.share(plan)
+            self._versions[plan_id] += 1
+            return plan
+
+    def append_progress(self, plan_id, events):
+        """Append progress events to the plan's history; returns them with their assigned seq"""
+        with self._lock:
+            log = self._progress.setdefault(plan_id, [])
+            last_seq = log[-1]['seq'] if log else 0
+            stored = [dict(event, seq=last_seq + i) for i, event in enumerate(events, 1)]
+            log.extend(stored)
+            return stored
+
+    def progress_events(self, plan_id, after_seq=0, limit=100):
+        """Progress events with seq > after_seq, oldest first"""
+        return [e for e in self._progress.get(plan_id, []) if e['seq'] > after_seq][:limit]
+
+    def flush(self):
+        pass
+
+    def get_stats(self):
+        return {'backend': 'memory', 'plans': len(self._plans), 'snapshots': snapshot_store.get_stats()}
+
+
+class SQLPlanStore:
+    """Plan store backed by the farming_plan_documents table
+
+    Reads go through a small per-worker LRU; new plans are written through
+    so any worker can serve them, while updates are buffered and flushed in
+    the background (write-behind). Updates are mutation functions: a flush
+    is a compare-and-set on the row's version, and when another worker got
+    there first the row is re-read and the pending mutations re-applied.
+    Weather and market payloads are stored once in plan_snapshots and
+    referenced by digest; a periodic sweep deletes snapshots no plan
+    references any more.
+    """
+
+    MAX_WRITE_ATTEMPTS = 5  # compare-and-set retries
+    MAX_SEQ_ATTEMPTS = 10  # progress seq allocation retries, each after a jittered pause
+
+    def __init__(self, app, cache_size=1000, cache_ttl=5, flush_interval=2,
+                 snapshot_gc_interval=3600, snapshot_gc_min_age=3600):
+        self.app = app
+        self.flush_interval = flush_interval
+        self.snapshot_gc_interval = snapshot_gc_interval
+        self.snapshot_gc_min_age = snapshot_gc_min_age
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl, name='plans')
+
+        self._dirty = {}  # plan_id -> pending write (see _queue_write)
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self._flusher = None
+        self._flusher_pid = None
+        self._stats = {'reads': 0, 'writes': 0, 'snapshots_written': 0, 'snapshots_loaded': 0,
+                       'progress_events_written': 0, 'progress_log_errors': 0, 'progress_seq_races': 0,
+                       'deferred_saves': 0, 'flushes': 0, 'flush_errors': 0, 'write_conflicts': 0,
+                       'snapshot_insert_races': 0, 'snapshots_collected': 0, 'snapshot_gc_errors': 0}
+
+        atexit.register(self.flush)
+
+    def get(self, plan_id):
+        """Read-through lookup: pending writes, then the LRU, then the database"""
+        entry = self._get_entry(plan_id)
+        return entry[0] if entry is not None else None
+
+    def _get_entry(self, plan_id):
+        """(plan, version) for a plan; version is None until a new plan's insert succeeds"""
+        with self._lock:
+            pending = self._dirty.get(plan_id)
+        if pending is not None:
+            return pending['plan'], pending['version']
+
+        entry = self.cache.get(plan_id)
+        if entry is not None:
+            return entry
+
+        entry = self._read(plan_id)
+        if entry is not None:
+            self.cache.set(plan_id, entry)
+        return entry
+
+    def put(self, plan):
+        """Write a new plan through to the database"""
+        snapshot_store.share(plan)
+        self.cache.set(plan['plan_id'], (plan, None))
+        with self._update_lock:
+            pending = self._queue_write(plan, None, [])
+        try:
+            self._write(plan['plan_id'], pending)
+        except Exception as e:
+            # Keep serving it from this worker and retry on the next flush
+            print(f"Plan store write error: {e}")
+            self._requeue(plan['plan_id'], pending)
+        self._ensure_flusher()
+
+    def update(self, plan_id, mutate):
+        """Apply mutate to a copy of the plan now and buffer it for the next background flush; returns the plan or None
+
+        The copy is swapped into the cache only once mutate succeeds, so
+        readers never see a half-applied update. mutate may be re-applied to a
+        fresher copy of the plan if another worker writes the plan first, so
+        it should only depend on its argument.
+        """
+        with self._update_lock:
+            entry = self._get_entry(plan_id)
+            if entry is None:
+                return None
+            plan, version = entry
+            plan = snapshot_store.copy_plan(plan)
+            mutate(plan)
+            snapshot_store.share(plan)
+
+            with self._lock:
+                pending = self._dirty.get(plan_id)
+            mutations = (pending['mutations'] if pending is not None else []) + [mutate]
+            if pending is not None:
+                version = pending['version']
+            pending = self._queue_write(plan, version, mutations)
+            with self._lock:
+                self._dirty[plan_id] = pending
+            self.cache.set(plan_id, (plan, version))
+        self._stats['deferred_saves'] += 1
+        self._ensure_flusher()
+        return plan
+
+    def version(self, plan_id):
+        """The plan row's version, without loading the plan; None for unknown plans"""
+        with self.app.app_context():
+            version = db.session.execute(
+                db.select(FarmingPlanDocument.version).where(FarmingPlanDocument.plan_id == plan_id)
+            ).scalar()
+        # Another worker wrote it: drop our cached copy so the next get() sees the change
+        cached = self.cache.peek(plan_id)
+        if cached is not None and cached[1] is not None and cached[1] != version:
+            with self._lock:
+                pending = plan_id in self._dirty
+            if not pending:
+                self.cache.invalidate(plan_id)
+        return version
+
+    def _queue_write(self, plan, version, mutations):
+        """Pending write for a plan, serialized now so the flusher never reads a plan being mutated"""
+        packed, snapshots = snapshot_store.pack(plan)
+        return {
+            'plan': plan,
+            'version': version,  # the row version these mutations were applied on top of
+            'mutations': mutations,
+            'payload': json.dumps(packed, default=str),
+            'snapshots': snapshots
+        }
+
+    def append_progress(self, plan_id, events):
+        """Insert progress events straight away; returns them with their assigned seq
+
+        seq is allocated in the database as MAX(seq)+1 inside the insert
+        transaction; if another worker takes the same seqs first the unique
+        constraint rejects the batch and it is retried. Raises if the events
+        could not be stored.
+        """
+        payloads = [{k: v for k, v in event.items() if k != 'seq'} for event in events]
+        for attempt in range(self.MAX_SEQ_ATTEMPTS):
+            if attempt:
+                # Jittered pause so writers that just collided don't pick the same MAX(seq) again
+                time.sleep(random.uniform(0, 0.02 * attempt))
+            with self.app.app_context():
+                try:
+                    last_seq = db.session.execute(
+                        db.select(db.func.max(ProgressEvent.seq)).where(ProgressEvent.plan_id == plan_id)
+                    ).scalar() or 0
+                    stored = []
+                    for seq, payload in enumerate(payloads, last_seq + 1):
+                        db.session.add(ProgressEvent(plan_id=plan_id, seq=seq, payload=json.dumps(payload, default=str)))
+                        stored.append(dict(payload, seq=seq))
+                    db.session.commit()
+                except IntegrityError:
+                    db.session.rollback()
+                    self._stats['progress_seq_races'] += 1
+                    continue
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Progress log write error: {e}")
+                    self._stats['progress_log_errors'] += 1
+                    raise
+            self._stats['progress_events_written'] += len(stored)
+            return stored
+
+        self._stats['progress_log_errors'] += 1
+        raise RuntimeError(f"could not allocate progress seqs for plan {plan_id}")
+
+    def progress_events(self, plan_id, after_seq=0, limit=100):
+        """Progress events with seq > after_seq, oldest first"""
+        with self.app.app_context():
+            rows = (ProgressEvent.query
+                    .filter(ProgressEvent.plan_id == plan_id, ProgressEvent.seq > after_seq)
+                    .order_by(ProgressEvent.seq)
+                    .limit(limit)
+                    .all())
+            return [row.to_dict() for row in rows]
+
+    def flush(self):
+        """Write every buffered plan to the database"""
+        with self._lock:
+            pending = dict(self._dirty)
+            self._dirty.clear()
+        if not pending:
+            return
+
+        failed = False
+        for plan_id, write in pending.items():
+            try:
+                self._write(plan_id, write)
+            except Exception as e:
+                print(f"Plan store flush error for {plan_id}: {e}")
+                self._requeue(plan_id, write)
+                failed = True
+        self._stats['flush_errors' if failed else 'flushes'] += 1
+
+    def _requeue(self, plan_id, write):
+        """Put a failed write back, ahead of any update queued since"""
+        with self._update_lock, self._lock:
+            newer = self._dirty.get(plan_id)
+            if newer is not None:
+                write = dict(newer, version=write['version'], mutations=write['mutations'] + newer['mutations'])
+            self._dirty[plan_id] = write
+        self._ensure_flusher()
+
+    def _read(self, plan_id):
+        """(plan, version) straight from the database, or None"""
+        with self.app.app_context():
+            row = db.session.execute(
+                db.select(FarmingPlanDocument.payload, FarmingPlanDocument.version)
+                .where(FarmingPlanDocument.plan_id == plan_id)
+            ).first()
+            self._stats['reads'] += 1
+            if row is None:
+                return None
+            return snapshot_store.unpack(json.loads(row.payload), self._load_snapshots), row.version
+
+    def _write(self, plan_id, write):
+        """Insert or compare-and-set one plan, re-applying its mutations to the stored row on conflict"""
+        for _ in range(self.MAX_WRITE_ATTEMPTS):
+            if self._try_write(plan_id, write):
+                break
+            self._stats['write_conflicts'] += 1
+            entry = self._read(plan_id)
+            if entry is None:
+                raise RuntimeError(f"plan {plan_id} disappeared during write")
+            plan, version = entry
+            for mutate in write['mutations']:
+                mutate(plan)
+            snapshot_store.share(plan)
+            write = self._queue_write(plan, version, write['mutations'])
+        else:
+            raise RuntimeError(f"plan {plan_id} kept changing under {self.MAX_WRITE_ATTEMPTS} writes")
+
+        self._stats['writes'] += 1
+        new_version = 1 if write['version'] is None else write['version'] + 1
+        with self._update_lock:
+            with self._lock:
+                superseded = plan_id in self._dirty
+            if not superseded:
+                self.cache.set(plan_id, (write['plan'], new_version))
+
+    def _try_write(self, plan_id, write):
+        """One insert/compare-and-set attempt; False if the row isn't at the expected version"""
+        with self.app.app_context():
+            try:
+                self._write_snapshots(write['snapshots'])
+                if write['version'] is None:
+                    if db.session.query(FarmingPlanDocument.id).filter_by(plan_id=plan_id).first() is not None:
+                        db.session.rollback()
+                        return False
+                    db.session.add(FarmingPlanDocument(plan_id=plan_id, payload=write['payload']))
+                else:
+                    result = db.session.execute(
+                        db.update(FarmingPlanDocument)
+                        .where(FarmingPlanDocument.plan_id == plan_id,
+                               FarmingPlanDocument.version == write['version'])
+                        .values(payload=write['payload'], version=FarmingPlanDocument.version + 1,
+                                updated_at=datetime.utcnow())
+                        .execution_options(synchronize_session=False)
+                    )
+                    if result.rowcount != 1:
+                        db.session.rollback()
+                        return False
+                db.session.commit()
+                return True
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def _write_snapshots(self, snapshots):
+        """Insert shared payloads the database doesn't have yet"""
+        if not snapshots:
+            return
+        stored = {
+            row.digest
+            for row in db.session.query(PlanSnapshot.digest).filter(PlanSnapshot.digest.in_(list(snapshots))).all()
+        }
+        for digest, payload in snapshots.items():
+            if digest in stored:
+                continue
+            # Another worker may insert the same digest first; that only loses this savepoint, not the plan write
+            try:
+                with db.session.begin_nested():
+                    db.session.add(PlanSnapshot(digest=digest, payload=json.dumps(payload, default=str)))
+                self._stats['snapshots_written'] += 1
+            except IntegrityError:
+                self._stats['snapshot_insert_races'] += 1
+
+    def collect_snapshots(self):
+        """Delete stored snapshots that no plan references; returns how many were deleted
+
+        Only snapshots older than snapshot_gc_min_age are candidates, so ones
+        written alongside an in-flight plan write are never swept.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.snapshot_gc_min_age)
+        with self.app.app_context():
+            try:
+                candidates = set(db.session.execute(
+                    db.select(PlanSnapshot.digest).where(PlanSnapshot.created_at < cutoff)
+                ).scalars())
+                if candidates:
+                    payloads = db.session.execute(
+                        db.select(FarmingPlanDocument.payload).execution_options(yield_per=500)
+                    ).scalars()
+                    for payload in payloads:
+                        candidates.difference_update(SNAPSHOT_REF_PATTERN.findall(payload))
+                        if not candidates:
+                            break
+                unreferenced = list(candidates)
+                for start in range(0, len(unreferenced), 500):
+                    db.session.execute(
+                        db.delete(PlanSnapshot).where(PlanSnapshot.digest.in_(unreferenced[start:start + 500]))
+                    )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        self._stats['snapshots_collected'] += len(unreferenced)
+        return len(unreferenced)
+
+    def _load_snapshots(self, digests):
+        """Payloads for snapshots this worker no longer holds"""
+        rows = PlanSnapshot.query.filter(PlanSnapshot.digest.in_(digests)).all()
+        self._stats['snapshots_loaded'] += len(rows)
+        return {row.digest: json.loads(row.payload) for row in rows}
+
+    def _ensure_flusher(self):
+        """Start the flush thread lazily so forked workers each get their own"""
+        if self._flusher is not None and self._flusher.is_alive() and self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive() and self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+            self._flusher = threading.Thread(target=self._flush_loop, name='plan-store-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        next_gc = time.monotonic() + self.snapshot_gc_interval
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+            if self.snapshot_gc_interval and time.monotonic() >= next_gc:
+                next_gc = time.monotonic() + self.snapshot_gc_interval
+                try:
+                    self.collect_snapshots()
+                except Exception as e:
+                    print(f"Snapshot sweep error: {e}")
+                    self._stats['snapshot_gc_errors'] += 1
+
+    def get_stats(self):
+        stats = dict(self._stats)
+        with self._lock:
+            stats['pending_writes'] = len(self._dirty)
+        stats['backend'] = 'sql'
+        stats['cache'] = self.cache.get_stats()
+        stats['snapshots'] = snapshot_store.get_stats()
+        return stats
@@ -0,0 +1,55 @@
+import os
+
+SMAPS_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def current_rss_kb():
+    """Resident set size of this process in KiB, or None off Linux"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def process_memory():
+    """Rss/Pss and shared vs private page totals for this process (KiB), or None off Linux"""
+    try:
+        with open('/proc/self/smaps_rollup') as rollup:
+            return _parse_smaps_fields(rollup)
+    except OSError:
+        return None
+
+
+def mapped_file_memory(directory):
+    """Per-file Rss/Pss (KiB) of files under directory mapped into this process, e.g. mmapped model arrays"""
+    directory = os.path.abspath(directory) + os.sep
+    files = {}
+    try:
+        with open('/proc/self/smaps') as smaps:
+            current = None
+            for line in smaps:
+                fields = line.split()
+                if not fields:
+                    continue
+                if not fields[0].endswith(':'):
+                    # Mapping header: address perms offset dev inode [path]
+                    path = fields[5] if len(fields) > 5 else ''
+                    current = files.setdefault(path, dict.fromkeys(SMAPS_FIELDS, 0)) if path.startswith(directory) else None
+                elif current is not None and fields[0][:-1] in SMAPS_FIELDS:
+                    current[fields[0][:-1]] += int(fields[1])
+    except OSError:
+        return None
+    return {os.path.basename(path): usage for path, usage in files.items()}
+
+
+def _parse_smaps_fields(lines):
+    usage = {}
+    for line in lines:
+        fields = line.split()
+        if fields and fields[0][:-1] in SMAPS_FIELDS:
+            usage[fields[0][:-1]] = int(fields[1])
+    return usage
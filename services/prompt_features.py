@@ -0,0 +1,75 @@
+RAIN_CHANCE_THRESHOLD = 50  # % chance of rain that counts as a rain day
+RAIN_MM_THRESHOLD = 1.0  # mm of precipitation that counts as a rain day
+
+
+def summarize_weather(weather_data):
+    """Summarize a weatherapi forecast payload into a few prompt-ready fields"""
+    weather_data = weather_data or {}
+    location = weather_data.get('location', {})
+    current = weather_data.get('current', {})
+    days = weather_data.get('forecast', {}).get('forecastday', [])
+
+    summary = {
+        'location': ', '.join(p for p in [location.get('name'), location.get('region')] if p),
+        'current': {
+            'temp_c': current.get('temp_c'),
+            'condition': current.get('condition', {}).get('text'),
+            'humidity': current.get('humidity')
+        },
+        'forecast_days': len(days)
+    }
+
+    if days:
+        day_data = [d.get('day', {}) for d in days]
+        max_temps = [d['maxtemp_c'] for d in day_data if d.get('maxtemp_c') is not None]
+        min_temps = [d['mintemp_c'] for d in day_data if d.get('mintemp_c') is not None]
+        humidities = [d['avghumidity'] for d in day_data if d.get('avghumidity') is not None]
+        rain_dates = [
+            day.get('date') for day, d in zip(days, day_data)
+            if d.get('daily_chance_of_rain', 0) >= RAIN_CHANCE_THRESHOLD
+            or d.get('totalprecip_mm', 0) >= RAIN_MM_THRESHOLD
+        ]
+
+        summary.update({
+            'period': f"{days[0].get('date')} to {days[-1].get('date')}",
+            'temp_range_c': [min(min_temps), max(max_temps)] if min_temps and max_temps else None,
+            'avg_humidity': round(sum(humidities) / len(humidities)) if humidities else None,
+            'rain_days': len(rain_dates),
+            'rain_dates': rain_dates[:5],
+            'total_precip_mm': round(sum(d.get('totalprecip_mm', 0) for d in day_data), 1)
+        })
+
+    alerts = weather_data.get('alerts', {}).get('alert', [])
+    if alerts:
+        summary['alerts'] = [a.get('headline') or a.get('event') for a in alerts[:2]]
+
+    return summary
+
+
+def summarize_market(market_prices):
+    """Summarize a market payload into latest price and trend per symbol"""
+    items = (market_prices or {}).get('data') or []
+    by_symbol = {}
+    for item in items:
+        symbol = item.get('symbol') or item.get('name') or 'UNKNOWN'
+        by_symbol.setdefault(symbol, []).append(item)
+
+    summary = []
+    for symbol, rows in by_symbol.items():
+        prices = [r.get('price', r.get('close')) for r in rows if r.get('price', r.get('close')) is not None]
+        changes = [r['change_percent'] for r in rows if r.get('change_percent') is not None]
+
+        # EOD/intraday rows are newest first; a single quote carries its own change
+        if len(prices) > 1 and prices[-1]:
+            change = round((prices[0] - prices[-1]) / prices[-1] * 100, 2)
+        else:
+            change = changes[0] if changes else 0
+
+        summary.append({
+            'symbol': symbol,
+            'latest_price': prices[0] if prices else None,
+            'change_percent': change,
+            'trend': 'rising' if change > 1 else 'falling' if change < -1 else 'stable'
+        })
+
+    return summary
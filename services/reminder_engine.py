@@ -0,0 +1,181 @@
+import threading
+from collections import OrderedDict
+
+
+class PlanRuleState:
+    """Last rule inputs/outputs for one plan plus priority and type indexes"""
+
+    def __init__(self):
+        self.fingerprints = {}
+        self.outputs = {}
+        self.reminders = []
+        self.alerts = []
+        self.by_priority = {'reminders': {}, 'alerts': {}}
+        self.by_type = {'reminders': {}, 'alerts': {}}
+
+    def rebuild(self, rule_names):
+        """Merge rule outputs in rule order and re-index them"""
+        self.reminders = [r for name in rule_names for r in self.outputs.get(name, {}).get('reminders', [])]
+        self.alerts = [a for name in rule_names for a in self.outputs.get(name, {}).get('alerts', [])]
+
+        for kind, items in (('reminders', self.reminders), ('alerts', self.alerts)):
+            by_priority, by_type = {}, {}
+            for item in items:
+                by_priority.setdefault(item.get('priority'), []).append(item)
+                by_type.setdefault(item.get('type'), []).append(item)
+            self.by_priority[kind] = by_priority
+            self.by_type[kind] = by_type
+
+
+class ReminderEngine:
+    """Incremental reminder/alert rules
+
+    Each rule declares a cheap fingerprint of its inputs (weather, phase or
+    market); evaluate() re-runs only the rules whose fingerprint changed and
+    keeps the merged results indexed by priority and type.
+    """
+
+    def __init__(self, max_plans=10000):
+        self.max_plans = max_plans
+        self.rules = [
+            ('weather', self._weather_fingerprint, self._weather_rule),
+            ('phase', self._phase_fingerprint, self._phase_rule),
+            ('market', self._market_fingerprint, self._market_rule)
+        ]
+        self._rule_names = [name for name, _, _ in self.rules]
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        self._eval_lock = threading.Lock()  # rule state is shared by request and scheduler threads
+        self._stats = {'evaluations': 0, 'rule_runs': 0, 'rule_skips': 0}
+
+    def evaluate(self, plan):
+        """Re-run changed rules and refresh the plan's reminders and alerts; returns True if anything changed"""
+        with self._eval_lock:
+            return self._evaluate(plan)
+
+    def _evaluate(self, plan):
+        state = self._get_state(plan['plan_id'])
+        self._stats['evaluations'] += 1
+
+        changed = False
+        for name, fingerprint, rule in self.rules:
+            key = fingerprint(plan)
+            if name in state.fingerprints and state.fingerprints[name] == key:
+                self._stats['rule_skips'] += 1
+                continue
+            state.outputs[name] = rule(plan)
+            state.fingerprints[name] = key
+            self._stats['rule_runs'] += 1
+            changed = True
+
+        if changed:
+            state.rebuild(self._rule_names)
+            plan['reminders'] = state.reminders
+            plan['alerts'] = state.alerts
+        return changed
+
+    def query(self, plan, kind, priority=None, alert_type=None):
+        """Reminders or alerts for a plan filtered via the indexes"""
+        with self._eval_lock:
+            self._evaluate(plan)
+            state = self._get_state(plan['plan_id'])
+
+            if priority is not None and alert_type is not None:
+                return [i for i in state.by_priority[kind].get(priority, []) if i.get('type') == alert_type]
+            if priority is not None:
+                return list(state.by_priority[kind].get(priority, []))
+            if alert_type is not None:
+                return list(state.by_type[kind].get(alert_type, []))
+            return list(getattr(state, kind))
+
+    def _get_state(self, plan_id):
+        with self._lock:
+            state = self._states.get(plan_id)
+            if state is None:
+                state = PlanRuleState()
+                self._states[plan_id] = state
+                while len(self._states) > self.max_plans:
+                    self._states.popitem(last=False)
+            else:
+                self._states.move_to_end(plan_id)
+            return state
+
+    # Weather-based alerts
+
+    def _weather_days(self, plan):
+        weather = plan.get('weather_forecast', {})
+        if not weather.get('forecast'):
+            return []
+        return weather['forecast'].get('forecastday', [])[:7]  # Next 7 days
+
+    def _weather_fingerprint(self, plan):
+        return tuple(
+            (day.get('date'), day.get('day', {}).get('daily_chance_of_rain', 0))
+            for day in self._weather_days(plan)
+        )
+
+    def _weather_rule(self, plan):
+        alerts = []
+        for day in self._weather_days(plan):
+            if day.get('day', {}).get('daily_chance_of_rain', 0) > 70:
+                alerts.append({
+                    'type': 'rain_alert',
+                    'message': f"High chance of rain ({day['day']['daily_chance_of_rain']}%) on {day['date']}. Consider protecting your crops.",
+                    'date': day['date'],
+                    'priority': 'high'
+                })
+        return {'alerts': alerts}
+
+    # Timeline-based reminders
+
+    def _phase_fingerprint(self, plan):
+        # Activities and durations too: an AI timeline can rewrite a phase but keep its name
+        weeks = plan.get('timeline', {}).get('weeks', [])
+        return (
+            plan.get('current_phase', 'planning'),
+            tuple((week.get('phase'), tuple(week.get('activities', [])), week.get('duration')) for week in weeks)
+        )
+
+    def _phase_rule(self, plan):
+        reminders = []
+        current_phase = plan.get('current_phase', 'planning')
+        for week_data in plan.get('timeline', {}).get('weeks', []):
+            if week_data.get('phase') == current_phase:
+                for activity in week_data.get('activities', []):
+                    reminders.append({
+                        'type': 'activity_reminder',
+                        'message': f"Time to {activity.lower()}",
+                        'activity': activity,
+                        'phase': week_data.get('phase'),
+                        'priority': 'medium'
+                    })
+        return {'reminders': reminders}
+
+    # Market-based alerts
+
+    def _market_fingerprint(self, plan):
+        return tuple(
+            (crop, data['data'][0].get('change_percent', 0) if data and data.get('data') else None)
+            for crop, data in plan.get('market_data', {}).items()
+        )
+
+    def _market_rule(self, plan):
+        alerts = []
+        for crop, data in plan.get('market_data', {}).items():
+            if data and 'data' in data and data['data']:
+                price_change = data['data'][0].get('change_percent', 0)
+                if abs(price_change) > 5:  # Significant price change
+                    alerts.append({
+                        'type': 'market_alert',
+                        'message': f"{crop} prices changed by {price_change}%. Consider timing your harvest/sale.",
+                        'crop': crop,
+                        'change': price_change,
+                        'priority': 'medium'
+                    })
+        return {'alerts': alerts}
+
+    def get_stats(self):
+        stats = dict(self._stats)
+        with self._lock:
+            stats['tracked_plans'] = len(self._states)
+        return stats
@@ -0,0 +1,28 @@
+class RequestMemo:
+    """Memoizes sub-computations for the lifetime of a single request"""
+
+    def __init__(self):
+        self._values = {}
+        self.computed = 0
+        self.reused = 0
+        self.seeded = 0
+
+    def get_or_compute(self, key, compute):
+        """Return the value for key, computing it only the first time"""
+        if key in self._values:
+            self.reused += 1
+            return self._values[key]
+
+        value = compute()
+        self._values[key] = value
+        self.computed += 1
+        return value
+
+    def seed(self, key, value):
+        """Provide a value that is already known, e.g. data the plan holds"""
+        if key not in self._values:
+            self._values[key] = value
+            self.seeded += 1
+
+    def get_stats(self):
+        return {'computed': self.computed, 'reused': self.reused, 'seeded': self.seeded}
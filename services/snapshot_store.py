@@ -0,0 +1,137 @@
+import copy
+import hashlib
+import json
+import threading
+import weakref
+
+SNAPSHOT_REF_KEY = '$snapshot'
+
+
+class SharedPayload(dict):
+    """A weather or market payload shared read-only by every plan that holds it"""
+
+    __slots__ = ('digest', '__weakref__')
+
+
+class SnapshotStore:
+    """Content-addressed, weakly referenced weather/market payloads
+
+    Plans in the same district usually carry identical forecasts and market
+    data. Interning stores each distinct payload once per worker, keyed by
+    the sha256 of its canonical JSON; a snapshot is evicted as soon as no
+    plan references it any more.
+    """
+
+    def __init__(self):
+        self._snapshots = weakref.WeakValueDictionary()  # digest -> SharedPayload
+        self._lock = threading.Lock()
+        self._stats = {'interned': 0, 'shared': 0, 'bytes_deduplicated': 0}
+
+    def intern(self, payload):
+        """Return the shared snapshot equal to payload, creating it if needed"""
+        if isinstance(payload, SharedPayload) or not isinstance(payload, dict):
+            return payload
+
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+        digest = hashlib.sha256(encoded).hexdigest()
+        with self._lock:
+            snapshot = self._snapshots.get(digest)
+            if snapshot is not None:
+                self._stats['shared'] += 1
+                self._stats['bytes_deduplicated'] += len(encoded)
+                return snapshot
+
+            # Deep copy: nested lists/dicts mustn't stay shared with the caller (e.g. a live API cache entry)
+            snapshot = SharedPayload(copy.deepcopy(payload))
+            snapshot.digest = digest
+            self._snapshots[digest] = snapshot
+            self._stats['interned'] += 1
+            return snapshot
+
+    def adopt(self, digest, payload):
+        """Register a payload loaded by digest (e.g. from the database)"""
+        with self._lock:
+            snapshot = self._snapshots.get(digest)
+            if snapshot is None:
+                snapshot = SharedPayload(payload)
+                snapshot.digest = digest
+                self._snapshots[digest] = snapshot
+            return snapshot
+
+    def get(self, digest):
+        return self._snapshots.get(digest)
+
+    # Plans
+
+    def share(self, plan):
+        """Replace the plan's weather and market payloads with shared snapshots"""
+        if plan.get('weather_forecast'):
+            plan['weather_forecast'] = self.intern(plan['weather_forecast'])
+        market_data = plan.get('market_data') or {}
+        for crop_name, market in market_data.items():
+            if market:
+                market_data[crop_name] = self.intern(market)
+        return plan
+
+    def copy_plan(self, plan):
+        """Deep copy of a plan for mutation; shared snapshots are read-only, so they stay shared"""
+        memo = {}
+        for value in [plan.get('weather_forecast')] + list((plan.get('market_data') or {}).values()):
+            if isinstance(value, SharedPayload):
+                memo[id(value)] = value
+        return copy.deepcopy(plan, memo)
+
+    def pack(self, plan):
+        """Plan copy with shared payloads replaced by references, plus the referenced snapshots"""
+        snapshots = {}
+
+        def ref(value):
+            if isinstance(value, SharedPayload):
+                snapshots[value.digest] = value
+                return {SNAPSHOT_REF_KEY: value.digest}
+            return value
+
+        packed = dict(plan)
+        if 'weather_forecast' in packed:
+            packed['weather_forecast'] = ref(packed['weather_forecast'])
+        if packed.get('market_data'):
+            packed['market_data'] = {crop: ref(market) for crop, market in packed['market_data'].items()}
+        return packed, snapshots
+
+    def unpack(self, packed, load_missing):
+        """Resolve references in a packed plan; load_missing(digests) returns {digest: payload}"""
+        refs = []
+        if self._is_ref(packed.get('weather_forecast')):
+            refs.append(packed['weather_forecast'][SNAPSHOT_REF_KEY])
+        for market in (packed.get('market_data') or {}).values():
+            if self._is_ref(market):
+                refs.append(market[SNAPSHOT_REF_KEY])
+
+        resolved = {digest: self.get(digest) for digest in refs}
+        missing = [digest for digest, snapshot in resolved.items() if snapshot is None]
+        if missing:
+            for digest, payload in load_missing(missing).items():
+                resolved[digest] = self.adopt(digest, payload)
+
+        def deref(value):
+            if self._is_ref(value):
+                return resolved.get(value[SNAPSHOT_REF_KEY]) or {}
+            return value
+
+        if 'weather_forecast' in packed:
+            packed['weather_forecast'] = deref(packed['weather_forecast'])
+        if packed.get('market_data'):
+            packed['market_data'] = {crop: deref(market) for crop, market in packed['market_data'].items()}
+        return self.share(packed)
+
+    def _is_ref(self, value):
+        return isinstance(value, dict) and len(value) == 1 and SNAPSHOT_REF_KEY in value
+
+    def get_stats(self):
+        stats = dict(self._stats)
+        stats['live_snapshots'] = len(self._snapshots)
+        return stats
+
+
+# Initialize the snapshot store
+snapshot_store = SnapshotStore()
@@ -0,0 +1,173 @@
+import os
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+ARRAY_NAMES = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+
+class CompiledForest:
+    """A fitted sklearn RandomForestClassifier flattened into contiguous numpy arrays
+
+    Every tree's nodes are concatenated into one set of arrays and a batch is
+    walked level by level with vectorized gathers, so there is no per-node
+    Python work. Inputs are raw feature vectors in training column order
+    (categoricals already encoded) and are compared as float32, exactly as
+    sklearn does, so probabilities match ``predict_proba`` bit for bit.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, classes, max_depth):
+        self.feature = feature        # int32 (n_nodes,), 0 for leaves
+        self.threshold = threshold    # float64 (n_nodes,)
+        self.left = left              # int32 (n_nodes,), global node ids
+        self.right = right            # int32 (n_nodes,)
+        self.value = value            # float64 (n_nodes, n_classes), normalized per node
+        self.roots = roots            # int32 (n_trees,)
+        self.classes_ = classes
+        self.max_depth = max_depth
+        self.is_leaf = left == np.arange(len(left))
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+
+            # Same normalization DecisionTreeClassifier.predict_proba applies
+            value = tree.value[:, 0, :forest.n_classes_]
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.int32),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.int32),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.int32),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(forest.classes_),
+            max_depth=max(estimator.tree_.max_depth for estimator in forest.estimators_)
+        )
+
+    def save(self, path, source_digest=None):
+        """Write the arrays uncompressed so workers can memory-map (and share) them"""
+        state = {name: getattr(self, name) for name in ARRAY_NAMES}
+        state.update(classes=self.classes_, max_depth=self.max_depth, source_digest=source_digest)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Return (engine, source_digest); arrays are read-only memory maps by default"""
+        state = joblib.load(path, mmap_mode=mmap_mode)
+        engine = cls(
+            classes=np.asarray(state['classes']),
+            max_depth=state['max_depth'],
+            **{name: state[name] for name in ARRAY_NAMES}
+        )
+        return engine, state.get('source_digest')
+
+    def predict_proba(self, X):
+        """Class probabilities for a 2-D array of raw feature rows"""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        n_rows, n_features = X.shape
+        n_trees = len(self.roots)
+
+        # One cursor per (row, tree) pair; pairs drop out as they reach a leaf
+        flat_X = X.ravel()
+        nodes = np.tile(self.roots, n_rows)
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, n_trees)
+        active = np.arange(n_rows * n_trees)
+        for _ in range(self.max_depth):
+            current = nodes[active]
+            go_left = flat_X[row_offsets[active] + self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = current
+            active = active[~self.is_leaf[current]]
+            if len(active) == 0:
+                break
+
+        # Trees are summed in order, then averaged, like RandomForestClassifier
+        return np.add.reduce(self.value[nodes.reshape(n_rows, n_trees)], axis=1) / n_trees
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def probe_inputs(self, n_rows=256, seed=0):
+        """Rows that exercise both branches of the forest's splits, including exact thresholds"""
+        rng = np.random.default_rng(seed)
+        n_features = int(self.feature.max()) + 1
+        X = np.zeros((n_rows, n_features), dtype=np.float32)
+        for f in range(n_features):
+            thresholds = self.threshold[~self.is_leaf & (self.feature == f)]
+            if len(thresholds) == 0:
+                continue
+            low, high = thresholds.min(), thresholds.max()
+            margin = (high - low) * 0.1 + 1.0
+            X[:, f] = rng.uniform(low - margin, high + margin, n_rows)
+            exact = rng.random(n_rows) < 0.1
+            X[exact, f] = rng.choice(thresholds, exact.sum())
+        return X
+
+    def matches(self, forest, X=None):
+        """True if this engine reproduces forest.predict_proba exactly"""
+        X = self.probe_inputs() if X is None else np.asarray(X, dtype=np.float32)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # forests fitted on DataFrames warn about plain arrays
+            expected = forest.predict_proba(X)
+        return bool(np.array_equal(self.predict_proba(X), expected))
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ARRAY_NAMES)
+
+
+if __name__ == '__main__':
+    # Parity and latency check against sklearn: python services/tree_engine.py [models/crop_recommender.pkl]
+    import sys
+
+    import pandas as pd
+
+    warnings.filterwarnings('ignore')
+    forest = joblib.load(sys.argv[1] if len(sys.argv) > 1 else 'models/crop_recommender.pkl')
+    engine = CompiledForest.from_sklearn(forest)
+    columns = list(getattr(forest, 'feature_names_in_', range(forest.n_features_in_)))
+    X = engine.probe_inputs(n_rows=5000, seed=1)
+
+    print(f"{len(engine.roots)} trees, {len(engine.left)} nodes, depth {engine.max_depth}, {engine.nbytes / 1024:.0f} KiB")
+    print(f"parity on {len(X)} probe rows: {engine.matches(forest, X)}")
+
+    def bench(label, fn, repeat):
+        fn()
+        started_at = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        print(f"  {label:<28} {(time.perf_counter() - started_at) / repeat * 1000:8.3f} ms")
+
+    single = X[:1]
+    single_df = pd.DataFrame(single, columns=columns)
+    print("single row:")
+    bench("sklearn (DataFrame)", lambda: forest.predict_proba(single_df), 50)
+    bench("compiled", lambda: engine.predict_proba(single), 500)
+    for n_rows in (64, 256, 1000):
+        batch_df = pd.DataFrame(X[:n_rows], columns=columns)
+        print(f"{n_rows} rows:")
+        bench("sklearn (DataFrame)", lambda: forest.predict_proba(batch_df), 10)
+        bench("compiled", lambda: engine.predict_proba(X[:n_rows]), 10)
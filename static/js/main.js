@@ -113,23 +113,82 @@ function sendChatMessage() {
     addChatMessage(message, 'user');
     chatInput.value = '';
     
-    fetch('/api/financial-advice', {
+    const replyDiv = addChatMessage('', 'ai');
+    const replyText = replyDiv.querySelector('.stream-text');
+    
+    streamAdvice('/api/financial-advice/stream', { query: message, financial_data: {} }, {
+        onChunk: text => {
+            replyText.textContent += text;
+            chatMessages.scrollTop = chatMessages.scrollHeight;
+        },
+        onError: error => {
+            replyText.textContent = 'Sorry, I\'m having trouble connecting.';
+            console.error('Chat error:', error);
+        }
+    });
+}
+
+// Stream AI advice from an SSE endpoint, rendering each chunk as it arrives
+function streamAdvice(url, payload, handlers) {
+    const { onMeta = () => {}, onChunk = () => {}, onDone = () => {}, onError = () => {} } = handlers;
+    
+    return fetch(url, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ query: message, financial_data: {} })
+        headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+        body: JSON.stringify(payload)
     })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            addChatMessage(data.advice, 'ai');
-        } else {
-            addChatMessage('Sorry, I encountered an error. Please try again.', 'ai');
+    .then(response => {
+        if (!response.ok || !response.body) {
+            throw new Error(`Streaming request failed (${response.status})`);
         }
+        
+        // Failures before the stream starts come back as a JSON error body
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!contentType.startsWith('text/event-stream')) {
+            return response.json().then(data => {
+                throw new Error(data.error || 'Unexpected response from server');
+            });
+        }
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let finished = false;
+        
+        function handleEvent(frame) {
+            let event = 'message';
+            let data = '';
+            frame.split('\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            if (!data) return;
+            
+            const parsed = JSON.parse(data);
+            if (event === 'meta') onMeta(parsed);
+            else if (event === 'chunk') onChunk(parsed.text);
+            else if (event === 'done') { finished = true; onDone(); }
+            else if (event === 'error') { finished = true; onError(new Error(parsed.error)); }
+        }
+        
+        function read() {
+            return reader.read().then(({ done, value }) => {
+                if (done) {
+                    if (buffer.trim()) handleEvent(buffer);
+                    if (!finished) onDone();
+                    return;
+                }
+                buffer += decoder.decode(value, { stream: true });
+                const frames = buffer.split('\n\n');
+                buffer = frames.pop();
+                frames.forEach(handleEvent);
+                return read();
+            });
+        }
+        
+        return read();
     })
-    .catch(error => {
-        addChatMessage('Sorry, I\'m having trouble connecting.', 'ai');
-        console.error('Chat error:', error);
-    });
+    .catch(onError);
 }
 
 function addChatMessage(message, sender) {
@@ -138,10 +197,12 @@ function addChatMessage(message, sender) {
     
     const messageDiv = document.createElement('div');
     messageDiv.className = `chat-message ${sender}`;
-    messageDiv.innerHTML = `<strong>${sender === 'user' ? 'You' : 'AI Advisor'}:</strong> ${message}`;
+    messageDiv.innerHTML = `<strong>${sender === 'user' ? 'You' : 'AI Advisor'}:</strong> <span class="stream-text"></span>`;
+    messageDiv.querySelector('.stream-text').textContent = message;
     
     chatMessages.appendChild(messageDiv);
     chatMessages.scrollTop = chatMessages.scrollHeight;
+    return messageDiv;
 }
 
 function handlePestCheck(e) {
@@ -157,31 +218,30 @@ function handlePestCheck(e) {
         return;
     }
     
-    resultsDiv.innerHTML = '<div class="loading">Analyzing crop health...</div>';
+    resultsDiv.innerHTML = `
+        <h4><i class="fas fa-bug"></i> AI Diagnosis & Treatment Plan</h4>
+        <div class="ai-response stream-text"><div class="loading">Analyzing crop health...</div></div>
+        <button class="button" onclick="closeModal()">Close</button>
+    `;
+    const adviceDiv = resultsDiv.querySelector('.ai-response');
+    let started = false;
     
-    fetch('/api/pest-disease-advice', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-            crop: cropName,
-            symptoms: symptoms,
-            weather_conditions: weatherConditions
-        })
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            resultsDiv.innerHTML = `
-                <h4><i class="fas fa-bug"></i> AI Diagnosis & Treatment Plan</h4>
-                <div class="ai-response">${data.advice}</div>
-                <button class="button" onclick="closeModal()">Close</button>
-            `;
-        } else {
-            resultsDiv.innerHTML = '<div class="error">Sorry, we encountered an error. Please try again.</div>';
+    streamAdvice('/api/pest-disease-advice/stream', {
+        crop: cropName,
+        symptoms: symptoms,
+        weather_conditions: weatherConditions
+    }, {
+        onChunk: text => {
+            if (!started) {
+                adviceDiv.textContent = '';
+                started = true;
+            }
+            adviceDiv.textContent += text;
+        },
+        onError: error => {
+            resultsDiv.innerHTML = '<div class="error">Sorry, we\'re having trouble connecting. Please try again later.</div>';
+            resultsDiv.querySelector('.error').append(document.createElement('br'), error.message);
         }
-    })
-    .catch(error => {
-        resultsDiv.innerHTML = '<div class="error">Sorry, we\'re having trouble connecting. Please try again later.</div>';
     });
 }
 
@@ -197,41 +257,41 @@ function handleHarvestPlanning(e) {
         return;
     }
     
-    resultsDiv.innerHTML = '<div class="loading">Planning your harvest...</div>';
+    resultsDiv.innerHTML = `
+        <h4><i class="fas fa-cut"></i> Harvest Plan & Market Analysis</h4>
+        <div class="ai-response stream-text"><div class="loading">Planning your harvest...</div></div>
+        <div class="price-info"></div>
+        <button class="button" onclick="closeModal()">Close</button>
+    `;
+    const adviceDiv = resultsDiv.querySelector('.ai-response');
+    let started = false;
     
-    fetch('/api/harvesting-advice', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ crop: crop, location: location })
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.success) {
-            let priceInfo = '';
-            if (data.price_prediction) {
-                priceInfo = `
+    streamAdvice('/api/harvesting-advice/stream', { crop: crop, location: location }, {
+        onMeta: meta => {
+            const prediction = meta.price_prediction;
+            if (prediction) {
+                resultsDiv.querySelector('.price-info').innerHTML = `
                     <div class="price-prediction">
                         <h5>Price Forecast:</h5>
-                        <p>Current: ₹${data.price_prediction.current_price}/quintal</p>
-                        <p>Predicted (30 days): ₹${data.price_prediction.future_price}/quintal</p>
-                        <p>Trend: ${data.price_prediction.trend_percentage}%</p>
-                        <p><strong>Recommendation:</strong> ${data.price_prediction.recommendation}</p>
+                        <p>Current: ₹${prediction.current_price}/quintal</p>
+                        <p>Predicted (30 days): ₹${prediction.future_price}/quintal</p>
+                        <p>Trend: ${prediction.trend_percentage}%</p>
+                        <p><strong>Recommendation:</strong> ${prediction.recommendation}</p>
                     </div>
                 `;
             }
-            
-            resultsDiv.innerHTML = `
-                <h4><i class="fas fa-cut"></i> Harvest Plan & Market Analysis</h4>
-                <div class="ai-response">${data.advice}</div>
-                ${priceInfo}
-                <button class="button" onclick="closeModal()">Close</button>
-            `;
-        } else {
-            resultsDiv.innerHTML = '<div class="error">Sorry, we encountered an error. Please try again.</div>';
+        },
+        onChunk: text => {
+            if (!started) {
+                adviceDiv.textContent = '';
+                started = true;
+            }
+            adviceDiv.textContent += text;
+        },
+        onError: error => {
+            resultsDiv.innerHTML = '<div class="error">Sorry, we\'re having trouble connecting. Please try again later.</div>';
+            resultsDiv.querySelector('.error').append(document.createElement('br'), error.message);
         }
-    })
-    .catch(error => {
-        resultsDiv.innerHTML = '<div class="error">Sorry, we\'re having trouble connecting. Please try again later.</div>';
     });
 }
 
@@ -275,4 +335,5 @@ function loadMarketData() {
 
 // Export functions for global access
 window.openModal = openModal;
-window.closeModal = closeModal;
\ No newline at end of file
+window.closeModal = closeModal;
+window.streamAdvice = streamAdvice;
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""Train the crop recommender and price forecaster and write models/model_bundle.joblib
+
+    python train_models.py                          # synthetic data, all cores
+    python train_models.py --crop-data soils.csv --price-data prices.csv --n-jobs 4
+
+The web app never trains; it loads the bundle written here.
+"""
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.preprocessing import LabelEncoder
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'services'))
+from model_bundle import BUNDLE_FILENAME, CROP_FEATURES, PRICE_FEATURES, save_bundle
+
+SOIL_TYPES = ['clay', 'sandy', 'loamy', 'silty']
+BASE_PRICES = {'wheat': 2400, 'rice': 3500, 'maize': 1800, 'cotton': 6000, 'sugarcane': 3200}
+
+
+@contextmanager
+def timed(label):
+    started_at = time.perf_counter()
+    yield
+    print(f"  {label:<32} {time.perf_counter() - started_at:8.2f} s")
+
+
+def synthetic_crop_data(n_samples=1000, seed=42):
+    """Soil/weather profiles labelled by agronomic rules"""
+    np.random.seed(seed)
+    data = {
+        'soil_type': np.random.choice(SOIL_TYPES, n_samples),
+        'soil_ph': np.random.normal(6.5, 1.0, n_samples),
+        'rainfall': np.random.normal(800, 200, n_samples),
+        'temperature': np.random.normal(28, 5, n_samples),
+        'humidity': np.random.normal(70, 10, n_samples),
+        'nitrogen': np.random.normal(50, 15, n_samples),
+        'phosphorus': np.random.normal(30, 10, n_samples),
+        'potassium': np.random.normal(40, 12, n_samples),
+        'budget': np.random.normal(50000, 15000, n_samples),
+        'land_size': np.random.normal(2, 1, n_samples)
+    }
+
+    # First matching rule wins
+    soil, ph, temp = data['soil_type'], data['soil_ph'], data['temperature']
+    rainfall, budget = data['rainfall'], data['budget']
+    loamy_warm = (soil == 'loamy') & (ph >= 6) & (ph <= 7.5) & (temp > 25)
+    data['crop'] = np.select(
+        [
+            loamy_warm & (rainfall > 700) & (budget > 40000),
+            loamy_warm & (rainfall < 600) & (budget > 30000),
+            loamy_warm,
+            (soil == 'sandy') & (temp > 30),
+            (soil == 'clay') & (ph > 7)
+        ],
+        ['rice', 'wheat', 'maize', 'cotton', 'sugarcane'],
+        default='vegetables'
+    )
+    return pd.DataFrame(data)
+
+
+def synthetic_price_data(start='2020-01-01', end='2024-01-01', seed=42):
+    """Daily prices per crop: base price with a seasonal swing and 10% noise"""
+    np.random.seed(seed)
+    dates = pd.date_range(start=start, end=end, freq='D')
+    crops = list(BASE_PRICES)
+
+    # One draw per (crop, day), in crop-major order
+    random_factor = np.random.normal(1, 0.1, (len(crops), len(dates)))
+    seasonal_factor = 1 + 0.2 * np.sin(2 * np.pi * dates.month.to_numpy() / 12)
+    base_price = np.array([BASE_PRICES[crop] for crop in crops])[:, np.newaxis]
+
+    return pd.DataFrame({
+        'date': np.tile(dates, len(crops)),
+        'crop': np.repeat(crops, len(dates)),
+        'price': (base_price * seasonal_factor * random_factor).ravel(),
+        'month': np.tile(dates.month, len(crops)),
+        'year': np.tile(dates.year, len(crops))
+    })
+
+
+def load_crop_data(path):
+    """CSV with the crop feature columns and a 'crop' label"""
+    df = pd.read_csv(path)
+    missing = [column for column in CROP_FEATURES + ['crop'] if column not in df.columns]
+    if missing:
+        raise SystemExit(f"{path} is missing columns: {', '.join(missing)}")
+    return df[CROP_FEATURES + ['crop']].dropna()
+
+
+def load_price_data(path):
+    """CSV with 'date' and 'price' columns (plus 'crop', unused by the model)"""
+    df = pd.read_csv(path, parse_dates=['date'])
+    if 'price' not in df.columns:
+        raise SystemExit(f"{path} is missing the 'price' column")
+    df['month'] = df['date'].dt.month
+    df['year'] = df['date'].dt.year
+    return df.dropna(subset=['price'])
+
+
+def train_crop_recommender(df, n_estimators, n_jobs, seed):
+    X = df[CROP_FEATURES].copy()
+    le_soil = LabelEncoder()
+    X['soil_type'] = le_soil.fit_transform(X['soil_type'])
+
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=seed, n_jobs=n_jobs)
+    model.fit(X, df['crop'])
+    return model, {'soil_type': le_soil}
+
+
+def train_price_forecaster(df, n_estimators, n_jobs, seed):
+    model = RandomForestRegressor(n_estimators=n_estimators, random_state=seed, n_jobs=n_jobs)
+    model.fit(df[PRICE_FEATURES], df['price'])
+    return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', BUNDLE_FILENAME),
+                        help=f'bundle path (default: models/{BUNDLE_FILENAME})')
+    parser.add_argument('--crop-data', help='CSV of labelled soil profiles (default: synthetic)')
+    parser.add_argument('--price-data', help='CSV of historical prices (default: synthetic)')
+    parser.add_argument('--samples', type=int, default=1000, help='synthetic soil profiles (default: %(default)s)')
+    parser.add_argument('--n-estimators', type=int, default=100, help='trees per forest (default: %(default)s)')
+    parser.add_argument('--n-jobs', type=int, default=-1, help='parallel fitting jobs, -1 for all cores (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    started_at = time.perf_counter()
+    print("Preparing data")
+    with timed("crop profiles"):
+        crop_data = load_crop_data(args.crop_data) if args.crop_data else synthetic_crop_data(args.samples, args.seed)
+    with timed("price history"):
+        price_data = load_price_data(args.price_data) if args.price_data else synthetic_price_data(seed=args.seed)
+    print(f"  {len(crop_data)} crop profiles, {len(price_data)} price rows")
+
+    print(f"Training (n_jobs={args.n_jobs})")
+    with timed("crop recommender"):
+        crop_recommender, label_encoders = train_crop_recommender(crop_data, args.n_estimators, args.n_jobs, args.seed)
+    with timed("price forecaster"):
+        price_forecaster = train_price_forecaster(price_data, args.n_estimators, args.n_jobs, args.seed)
+
+    # Workers use the forests one row at a time; don't ship the parallel setting
+    crop_recommender.set_params(n_jobs=None)
+    price_forecaster.set_params(n_jobs=None)
+
+    print("Writing bundle")
+    with timed(os.path.basename(args.output)):
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        manifest = save_bundle(args.output, crop_recommender, price_forecaster, label_encoders, CROP_FEATURES)
+    print(f"Done in {time.perf_counter() - started_at:.2f} s: {args.output} ({manifest['checksum'][:12]})")
+
+
+if __name__ == '__main__':
+    main()